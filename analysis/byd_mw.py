@@ -1,8 +1,11 @@
 ####  IMPORTS ################################
 from logging import Logger
+from functools import lru_cache
+from collections import Counter
+from itertools import accumulate
+from bisect import bisect_right
 import re
 
-from spacy.matcher import Matcher
 from spacy.tokens import Doc
 from spacy import Language
 from spacy.lang.char_classes import ALPHA, ALPHA_LOWER, ALPHA_UPPER, CONCAT_QUOTES, LIST_ELLIPSES, LIST_ICONS, HYPHENS
@@ -10,6 +13,12 @@ from spacy.util import compile_infix_regex
 
 from analysis.helper import Statistics
 
+# optional: linear-time matching via Google's RE2 (``pip install google-re2``)
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 
 #### PATTERNS ################################
 # 1) binary: writing forms that include both female and male people but differ from the written out pair form.
@@ -17,77 +26,125 @@ from analysis.helper import Statistics
 # 3) neopronouns: pronouns that are gender inclusive; these are not part of the official German language.
 # 4) different gender conceptions: words referring to non-heteronormative gender conceptions, specifically transgender, intersex and non-binary/genderqueer
 
+# closed set of neopronouns, matched as literal alternatives (longest first)
+NEOPRONOUNS = sorted(['hän', 'hen', 'ham', 'they', 'them', 'dey', 'demm', 'xier',
+                      'sier', 'sieer', 'si*er', 'si_er', 'si:er', 'sie*er', 'sie_er', 'sie:er'], key=len, reverse=True)
+
+# The patterns are matched against the texts of the tokens of a ``Doc``, joined by newlines (see ``match``); none of them matches a newline,
+# so each match lies within a single token. Case-insensitive patterns are wrapped in ``(?i:...)``, whole-token patterns in ``(?m:^...$)``.
 PATTERNS = {
-    'binary': [{'TEXT': {'REGEX': r'[A-Z]\S*((Innen|In|eR)|/-?(in|innen|r)|\((in|innen|r)\))\b'}}],
-    'gender_incl': [{'TEXT': {'REGEX': r'[A-Z]\S*(\*|_|:)(innen|in|r)\b'}}],
-    'neopronouns': [{'LOWER': {'REGEX': r'^((hän|hen|ham)|(they|them)|(dey|demm)|(sie?(\*|_|:)?er)|xier)$'}}],
-    'different_gender_conceptions': [{'LOWER': {'REGEX': r'((trans\*?-?(\*|gender|geschlechtlich(keit)?|ident|sexuell|sexualität|(-| )?mann|(-| )?frau|(-| )?person)|\btrans\b)|(inter-?(\*|geschlechtlich(keit)?|sex|sexuell|sexualität)|\binter\b)|(nicht-?binär|non-?binary|enby|gender-?fluid|poly-?gender)|(hetero-?normativität|hetero-?normativ|lgbtq?i?a?(2s)?\+?|lsbtt?i?a?q?\+|(gender.?)?queer))'}}], 
+    'binary': r'[A-Z]\S*((Innen|In|eR)|/-?(in|innen|r)|\((in|innen|r)\))\b',
+    'gender_incl': r'[A-Z]\S*(\*|_|:)(innen|in|r)\b',
+    'neopronouns': r'(?im:^(' + '|'.join(re.escape(p) for p in NEOPRONOUNS) + r')$)',
+    'different_gender_conceptions': r'(?i:((trans\*?-?(\*|gender|geschlechtlich(keit)?|ident|sexuell|sexualität|(-| )?mann|(-| )?frau|(-| )?person)|\btrans\b)|(inter-?(\*|geschlechtlich(keit)?|sex|sexuell|sexualität)|\binter\b)|(nicht-?binär|non-?binary|enby|gender-?fluid|poly-?gender)|(hetero-?normativität|hetero-?normativ|lgbtq?i?a?(2s)?\+?|lsbtt?i?a?q?\+|(gender.?)?queer)))', 
 }
 
 
-def match(file_name:str, matchers:dict[str,Matcher], doc:Doc, logger:Logger, statistics:Statistics):
+#### TOKENIZER INFIXES ########################
+# infixes of ``spacy.Language`` adjusted in ``setup``
+INFIXES = (
+    LIST_ELLIPSES
+    + LIST_ICONS
+    + [
+        r"(?<=[0-9])[+\\-\\*^](?=[0-9-])",
+        r"(?<=[{al}{q}])\\.(?=[{au}{q}])".format(
+            al=ALPHA_LOWER, au=ALPHA_UPPER, q=CONCAT_QUOTES
+        ),
+        r"(?<=[{a}]),(?=[{a}])".format(a=ALPHA),
+        r"(?<=[{a}])(?:{h})(?=[{a}])".format(a=ALPHA, h=HYPHENS),
+        # Account for symbols in gender writing forms (do not split them):
+        # r"(?<=[{a}0-9])[:<>=/](?=[{a}])".format(a=ALPHA), # OLD
+        r"(?<=[{a}0-9])[<>=](?=[{a}])".format(a=ALPHA),
+        r"(?<=[{a}0-9])([:/]\s)(?=[{a}])".format(a=ALPHA),
+    ]
+)
+INFIX_RE = compile_infix_regex(INFIXES)
+
+
+def match(file_name:str, matchers:dict[str,re.Pattern], doc:Doc, logger:Logger, statistics:Statistics):
     """
-    Runs ``spacy.matcher.Matcher`s` provided in ``matchers`` to check for occurrences in ``doc``, counts occurences and saves occurrences including where they occured ``file_name``.
+    Runs each regular expression of ``matchers`` over the tokens of ``doc`` to check for occurrences, counts occurences and saves occurrences including where they occured ``file_name``.
+    The token texts are joined by newlines and scanned at once; as no pattern matches a newline, every match lies within one token (as with a per-token search).
+    Each pattern is matched in a pass of its own, so a token matched by several patterns (e.g., "Transgender*innen") is counted for each of them; per pattern, a token is counted at most once.
 
     Args:
         file_name (str): Name of file where the text content (``doc``) is from.
-        matchers (dict[str,Matcher]): Dictionary of named regular expressions in the form of ``{patternname: (casesensitive, regex)}``.
+        matchers (dict[str,re.Pattern]): Compiled regular expression for each pattern name (see ``setup``).
         doc (Doc): Textual content to find matches in.
         logger (Logger): Instance of used ``Logger``.
         statistics (Statistics): Data object to directly save occurences to.
     """
+    suffix = ' {' + file_name[:-5] + '}'
+    words = [token.text for token in doc]
+    text = '\n'.join(words)
+    starts = list(accumulate((len(word) + 1 for word in words[:-1]), initial=0))   # offset of each token in ``text``
     for name, matcher in matchers.items():
-        matches = matcher(doc)
-        
-        for _, start, end in matches:
-            span = doc[start:end].text + ' {' + file_name[:-5] + '}'
-            if not name in statistics.byd_mw.match_lists.keys(): statistics.byd_mw.match_lists[name] = {}
-            statistics.byd_mw.match_lists[name][span] = statistics.byd_mw.match_lists[name].get(span, 0) + 1
-            statistics.byd_mw.num_matches[name] += 1
-            
+        found = set()
+        counts = Counter()
+        for m in matcher.finditer(text):
+            i = bisect_right(starts, m.start()) - 1
+            if i in found: continue
+            found.add(i)
+
+            span = words[i] + suffix
+            counts[span] += 1
             logger.info(f"FOUND byd_mw: {span}")
 
+        if not counts: continue
+        statistics.byd_mw.match_lists.setdefault(name, Counter()).update(counts)
+        statistics.byd_mw.num_matches[name] += counts.total()
 
-def setup(nlp:Language, logger:Logger, patterns:dict[list[dict]]=None, adj_infixs=True) -> dict[str,Matcher]:
+
+def setup(nlp:Language, logger:Logger, patterns:dict[str,str]=None, adj_infixs=True, use_re2=False) -> dict[str,re.Pattern]:
     """
-    Helps with setting up ``spacy.matcher.Matcher``s to check for occurrences specified by ``patterns``.
+    Helps with setting up the regular expressions to check for occurrences specified by ``patterns``.
 
     Args:
         nlp (Language): ``spacy.Language`` to adjust infixes for.
         logger (Logger): `Logger`` to use for logging.
-        patterns (dict[list[dict]], optional): Patterns for which to create ``spacy.matcher.Matcher``s. Defaults to None.
+        patterns (dict[str,str], optional): Named regular expressions to combine. Defaults to None.
+        use_re2 (bool, optional): If true and ``re2`` is installed, compiles the regular expressions with RE2 instead of ``re``.
+            Note that RE2's word boundaries and whitespace classes are ASCII-only, which may change matches next to umlauts or non-breaking spaces. Defaults to False.
 
     Returns:
-        dict[str,Matcher]: Dictionary of named and setup ``spacy.matcher.Matcher``s.
+        dict[str,re.Pattern]: Compiled regular expression for each of the ``patterns`` (invalid patterns are left out).
     """
-    if adj_infixs:
-        infixes = (
-            LIST_ELLIPSES
-            + LIST_ICONS
-            + [
-                r"(?<=[0-9])[+\\-\\*^](?=[0-9-])",
-                r"(?<=[{al}{q}])\\.(?=[{au}{q}])".format(
-                    al=ALPHA_LOWER, au=ALPHA_UPPER, q=CONCAT_QUOTES
-                ),
-                r"(?<=[{a}]),(?=[{a}])".format(a=ALPHA),
-                r"(?<=[{a}])(?:{h})(?=[{a}])".format(a=ALPHA, h=HYPHENS),
-                # Account for symbols in gender writing forms (do not split them):
-                # r"(?<=[{a}0-9])[:<>=/](?=[{a}])".format(a=ALPHA), # OLD
-                r"(?<=[{a}0-9])[<>=](?=[{a}])".format(a=ALPHA),
-                r"(?<=[{a}0-9])([:/]\s)(?=[{a}])".format(a=ALPHA),
-            ]
-        )
-
-        infix_re = compile_infix_regex(infixes)
-        nlp.tokenizer.infix_finditer = infix_re.finditer
+    if adj_infixs and nlp.tokenizer.infix_finditer != INFIX_RE.finditer:
+        nlp.tokenizer.infix_finditer = INFIX_RE.finditer
 
     if not patterns: patterns = PATTERNS
-    matchers = {}
-    for name, pattern in patterns.items():
+    return _compile_patterns(tuple(patterns.items()), use_re2, logger)
+
+
+@lru_cache(maxsize=8)
+def _compile_patterns(patterns:tuple[tuple[str,str]], use_re2:bool, logger:Logger) -> dict[str,re.Pattern]:
+    """
+    Compiles named regular expressions (cached, as ``setup`` may be called repeatedly with the same patterns).
+    The patterns are deliberately not combined into a single alternation: a scan of the alternation reports only one pattern per position, so text matched by several patterns would be counted only once.
+
+    Args:
+        patterns (tuple[tuple[str,str]]): Named regular expressions in the form of ``((patternname, regex), ...)``.
+        use_re2 (bool): If true and ``re2`` is installed, compiles with RE2 instead of ``re``.
+        logger (Logger): `Logger`` to use for logging.
+
+    Returns:
+        dict[str,re.Pattern]: Compiled regular expression for each of the ``patterns`` (invalid patterns are left out).
+    """
+    if use_re2 and re2 is None:
+        logger.warning('RE2 requested but not installed; falling back to re')
+        use_re2 = False
+
+    compiled = {}
+    for name, pattern in patterns:
         try:
-            matcher = Matcher(nlp.vocab)
-            matcher.add(name, [pattern])
-            matchers[name] = matcher
-        except Exception as e:
-            logger.warning(f"Matcher '{name}': {e}")
-    return matchers
+            compiled[name] = re.compile(pattern)
+        except re.error as e:
+            logger.warning(f"Pattern '{name}': {e}")
+            continue
+
+        if use_re2:
+            try:
+                compiled[name] = re2.compile(pattern)
+            except re2.error as e:
+                logger.warning(f"RE2 cannot compile pattern '{name}', falling back to re: {e}")
+    return compiled
\ No newline at end of file
@@ -1,10 +1,15 @@
 ####  IMPORTS ################################
+import os
 import sys
+import io
 import re
-import copy
 import logging
 import logging.config
 from dataclasses import dataclass, field
+from collections import defaultdict
+from collections.abc import Iterator
+from itertools import islice
+from multiprocessing import Pool
 
 from bz2 import BZ2File
 from wiktionary_de_parser import Parser
@@ -14,14 +19,25 @@ from helper import PRN_LIST_INDICATOR_FEMALE, PRN_LIST_INDICATOR_MALE
 
 import traceback
 
+# optional: parallel decompression of the multistream dump (``pip install indexed_bzip2``)
+try:
+    import indexed_bzip2
+except ImportError:
+    indexed_bzip2 = None
+
 #### CONSTANTS & GLOABAL VARIABLES ############
 BZFILE_PATH = 'data/meta/dewiktionary-20231001-pages-articles-multistream.xml.bz2' # Wiktionary data dump retrieved from: https://dumps.wikimedia.org/dewiktionary/20231001/
-bz_file = BZ2File(BZFILE_PATH)
+PAGES_PER_CHUNK = 200 # number of Wiktionary pages parsed at once by a worker process
 
 VERSION_EXT = '_v21'
 PATH_PRN_LIST = f"analysis/prn_list{VERSION_EXT}.csv"
 PATH_PRN_STATS = f"analysis/prn_stats{VERSION_EXT}"
 
+# cleaning and splitting of the word forms listed in the paragraphs 'Weibliche Wortformen' and 'Männliche Wortformen'
+CLEAN_OUTER_RE = re.compile(r':\[.*\] |\[\[|\]\]|<.*/>|\{\{.*\}\}|\(.*\)|\n|#Substantiv')
+CLEAN_INNER_RE = re.compile(r"_m|_f|<.*(<|>)|\*|.*_.*|.*(<|>)|(^|'').*''|^:|^ *(der|die|das)|#| ")
+SPLIT_RE = re.compile(r',|/|\||;|:')
+
 
 #### CLASS AND FUNC DEFINITIONS ###############
 @dataclass
@@ -37,14 +53,28 @@ class PRNs():
         sg:list[str] = field(default_factory=lambda: list())
         pl:list[str] = field(default_factory=lambda: list())
         oe:int = 0
-        retrieved_from:dict[str,set] = field(default_factory=lambda: dict())
+        retrieved_from:dict[str,set] = field(default_factory=lambda: defaultdict(set))
 
     @dataclass
     class Male():
         sg:list[str] = field(default_factory=lambda: list())
         pl:list[str] = field(default_factory=lambda: list())
         oe:int = 0
-        retrieved_from:dict[str,set] = field(default_factory=lambda: dict())
+        retrieved_from:dict[str,set] = field(default_factory=lambda: defaultdict(set))
+
+    def update(self, other:'PRNs'):
+        """
+        Adds the PRNs (and where they were retrieved from) of ``other`` to the PRNs of this instance.
+
+        Args:
+            other (PRNs): PRNs to add, e.g., compiled from another part of the Wiktionary dump.
+        """
+        for own, new in ((self.female, other.female), (self.male, other.male)):
+            own.sg.extend(new.sg)
+            own.pl.extend(new.pl)
+            own.oe += new.oe
+            for elem, titles in new.retrieved_from.items():
+                own.retrieved_from[elem] |= titles
 
     def to_list(self, sublists:list[list[str], str]=None) -> list[tuple[str,str]]:
         """
@@ -60,7 +90,7 @@ class PRNs():
 
         for sublist, label, source_dict in sublists if sublists else [(self.female.sg, PRN_LIST_INDICATOR_FEMALE, self.female.retrieved_from), (self.female.pl, PRN_LIST_INDICATOR_FEMALE, self.female.retrieved_from), 
                                                                       (self.male.sg, PRN_LIST_INDICATOR_MALE, self.male.retrieved_from), (self.male.pl, PRN_LIST_INDICATOR_MALE, self.male.retrieved_from)]:
-            prn_list.extend([(t.strip(), label, f"{'; '.join([f'https://de.wiktionary.org/w/index.php?title={source_title}' for source_title in source_dict[t]])}") for t in sublist if not t == '' and not re.search('^ *[a-z].*|^-.*', t)])
+            prn_list.extend([(t.strip(), label, f"{'; '.join([f'https://de.wiktionary.org/w/index.php?title={source_title}' for source_title in source_dict[t]])}") for t in sublist if t and not t.startswith('-') and not 'a' <= t.lstrip(' ')[:1] <= 'z'])
 
         return prn_list
     
@@ -74,7 +104,7 @@ class PRNs():
         female = set(self.female.sg) | set(self.female.pl)
         male = set(self.male.sg) | set(self.male.pl)
 
-        dummy = copy.deepcopy(female)
+        dummy = female.copy()
         female -= male
         male -= dummy
 
@@ -89,8 +119,8 @@ class PRNs():
             path (str, optional): File Path to where the PRNs shall be saved. Defaults to PATH_PRN_LIST.
         """
         prns = self.to_unique_list() if unique else self.to_list()
-        with open(path, mode='w', encoding='utf-8') as file:
-            file.write('\n'.join(f"{t[1]},{t[0]},{t[2]}" for t in prns))
+        with open(path, mode='w', encoding='utf-8', buffering=1<<20) as file:
+            file.writelines(f"{t[1]},{t[0]},{t[2]}\n" for t in prns)
     
     def print_stats(self, save_to_file:str=PATH_PRN_STATS):
         """
@@ -161,16 +191,16 @@ class PRNs():
             log.info(f"|  {'->  unique across gender':<25}{len(pl_set - other_set):>6}")
 
 
-def compile(save_to_file:bool=True, save_stats:bool=True):
+def make_filter(prn_obj:PRNs):
     """
-    Compile a list of PRNs (and their gender affiliation) from German Wiktionary dump.
+    Creates the custom method for ``wiktionary_de_parser.Parser`` that collects PRNs from the records' word forms into ``prn_obj``.
 
     Args:
-        save_to_file (bool, optional): If true, saves compiled list to file. Defaults to True.
-        save_stats (bool, optional): If true, saves statistics to file. Defaults to True.
-    """
-    prn_obj = PRNs(PRNs.Female(), PRNs.Male())
+        prn_obj (PRNs): Data object to collect PRNs in.
 
+    Returns:
+        Callable: Custom method returning ``{'gender': ...}`` for records that are PRNs themselves, ``False`` otherwise.
+    """
     def filter(_, text, current_record):
         gender = None
 
@@ -192,38 +222,30 @@ def compile(save_to_file:bool=True, save_stats:bool=True):
                             return False
 
                 if match_wwf and not match_mwf:
-                    sg = [re.sub('_m|_f|<.*(<|>)|\*|.*_.*|.*(<|>)|(^|\'\').*\'\'|^:|^ *(der|die|das)|#| ', '', wf) for wf in re.split(',|/|\||;|:', re.sub(':\[.*\] |\[\[|\]\]|<.*/>|\{\{.*\}\}|\(.*\)|\n|#Substantiv', ' ', match_wwf))]
+                    sg = [CLEAN_INNER_RE.sub('', wf) for wf in SPLIT_RE.split(CLEAN_OUTER_RE.sub(' ', match_wwf))]
                     prn_obj.female.sg.extend(sg)
                     for elem in sg:
-                        new = prn_obj.female.retrieved_from.get(elem,set())
-                        new.add(current_record['title'])
-                        prn_obj.female.retrieved_from[elem] = new
+                        prn_obj.female.retrieved_from[elem].add(current_record['title'])
                     gender = PRN_LIST_INDICATOR_MALE
                     try:
                         pl = [v for k, v in current_record['flexion'].items() if k.startswith('Nominativ Plural')]
                         prn_obj.male.pl.extend(pl)
                         for elem in pl:
-                            new = prn_obj.male.retrieved_from.get(elem,set())
-                            new.add(current_record['title'])
-                            prn_obj.male.retrieved_from[elem] = new
+                            prn_obj.male.retrieved_from[elem].add(current_record['title'])
                     except:
                         pass
                 
                 elif match_mwf and not match_wwf:
-                    sg = [re.sub('_m|_f|<.*(<|>)|\*|.*_.*|.*(<|>)|(^|\'\').*\'\'|^:|^ *(der|die|das)|#| ', '', wf) for wf in re.split(',|/|\||;|:', re.sub(':\[.*\] |\[\[|\]\]|<.*/>|\{\{.*\}\}|\(.*\)|\n|#Substantiv', ' ', match_mwf))]
+                    sg = [CLEAN_INNER_RE.sub('', wf) for wf in SPLIT_RE.split(CLEAN_OUTER_RE.sub(' ', match_mwf))]
                     prn_obj.male.sg.extend(sg)
                     for elem in sg:
-                        new = prn_obj.male.retrieved_from.get(elem, set())
-                        new.add(current_record['title'])
-                        prn_obj.male.retrieved_from[elem] = new
+                        prn_obj.male.retrieved_from[elem].add(current_record['title'])
                     gender = PRN_LIST_INDICATOR_FEMALE
                     try:
                         pl = [v for k, v in current_record['flexion'].items() if k.startswith('Nominativ Plural')]
                         prn_obj.female.pl.extend(pl)
                         for elem in pl:
-                            new = prn_obj.female.retrieved_from.get(elem, set())
-                            new.add(current_record['title'])
-                            prn_obj.female.retrieved_from[elem] = new
+                            prn_obj.female.retrieved_from[elem].add(current_record['title'])
                     except:
                         pass
         
@@ -233,24 +255,116 @@ def compile(save_to_file:bool=True, save_stats:bool=True):
 
         return {'gender': gender} if gender else False
 
+    return filter
+
 
-    for record in Parser(bz_file, custom_methods=[filter]):
+def parse_chunk(chunk:bytes) -> PRNs:
+    """
+    Collects the PRNs of a part of the Wiktionary dump.
+
+    Args:
+        chunk (bytes): Well-formed XML containing a part of the dump's pages (see ``read_chunks``).
+
+    Returns:
+        PRNs: PRNs found in ``chunk``.
+    """
+    prn_obj = PRNs(PRNs.Female(), PRNs.Male())
+
+    for record in Parser(io.BytesIO(chunk), custom_methods=[make_filter(prn_obj)]):
         if 'gender' not in record:
             continue
 
         if record['gender'] == PRN_LIST_INDICATOR_FEMALE:
             prn_obj.female.sg.append(record['title'])
-            new = prn_obj.female.retrieved_from.get(record['title'], set())
-            new.add(record['title'])
-            prn_obj.female.retrieved_from[record['title']] = new
+            prn_obj.female.retrieved_from[record['title']].add(record['title'])
             prn_obj.female.oe += 1
         elif record['gender'] == PRN_LIST_INDICATOR_MALE:
             prn_obj.male.sg.append(record['title'])
-            new = prn_obj.male.retrieved_from.get(record['title'], set())
-            new.add(record['title'])
-            prn_obj.male.retrieved_from[record['title']] = new
+            prn_obj.male.retrieved_from[record['title']].add(record['title'])
             prn_obj.male.oe += 1
 
+    return prn_obj
+
+
+def open_dump(path:str=BZFILE_PATH):
+    """
+    Opens the Wiktionary dump for reading.
+    Uses ``indexed_bzip2`` to decompress the dump's streams on all cores if installed, ``bz2.BZ2File`` otherwise.
+    An already decompressed dump (``.xml``) is read as is.
+
+    Args:
+        path (str, optional): Path to the dump. Defaults to BZFILE_PATH.
+
+    Returns:
+        Binary file object of the decompressed dump.
+    """
+    if path.endswith('.xml'):
+        return open(path, 'rb', buffering=1<<20)
+    if indexed_bzip2 is not None:
+        return indexed_bzip2.open(path, parallelization=os.cpu_count())
+    return BZ2File(path)
+
+
+def read_chunks(xml_file, num_pages:int=PAGES_PER_CHUNK) -> Iterator[bytes]:
+    """
+    Splits the (decompressed) Wiktionary dump into parts of ``num_pages`` pages that can be parsed independently of each other.
+    Each part is wrapped in the dump's header (including the siteinfo) and closing tag.
+
+    Args:
+        xml_file: Binary file object of the Wiktionary dump.
+        num_pages (int, optional): Number of pages per part. Defaults to PAGES_PER_CHUNK.
+
+    Yields:
+        Iterator[bytes]: Parts of the dump as well-formed XML.
+    """
+    header = []
+    for line in xml_file:
+        if b'<page>' in line:
+            break
+        header.append(line)
+    else:
+        return
+    header = b''.join(header)
+
+    pages = [line]
+    in_page = True
+    n = 0
+    for line in xml_file:
+        if b'<page>' in line:
+            in_page = True
+        if in_page:
+            pages.append(line)
+        if b'</page>' in line:
+            in_page = False
+            n += 1
+            if n == num_pages:
+                yield header + b''.join(pages) + b'</mediawiki>\n'
+                pages = []
+                n = 0
+    if pages:
+        yield header + b''.join(pages) + b'</mediawiki>\n'
+
+
+def compile(save_to_file:bool=True, save_stats:bool=True, processes:int=None):
+    """
+    Compile a list of PRNs (and their gender affiliation) from German Wiktionary dump.
+    The dump is split into parts that are parsed in parallel by ``processes`` worker processes.
+
+    Args:
+        save_to_file (bool, optional): If true, saves compiled list to file. Defaults to True.
+        save_stats (bool, optional): If true, saves statistics to file. Defaults to True.
+        processes (int, optional): Number of worker processes. Defaults to None (i.e., ``os.cpu_count()``).
+    """
+    prn_obj = PRNs(PRNs.Female(), PRNs.Male())
+    processes = processes or os.cpu_count()
+
+    with open_dump(BZFILE_PATH) as bz_file, Pool(processes) as pool:
+        chunks = read_chunks(bz_file)
+        # hand over a limited number of parts at a time, so that the decompressed dump is not read into memory as a whole
+        while window := list(islice(chunks, 4 * processes)):
+            for chunk_prns in pool.imap(parse_chunk, window):
+                prn_obj.update(chunk_prns)
+
     if save_to_file: prn_obj.write_to_file()
     if save_stats: prn_obj.print_stats()
 
@@ -1,14 +1,26 @@
 #### IMPORTS #################################
-from analysis.glean import glean_norm_values 
+from analysis.glean import lookup as glean_lookup
 from analysis.helper import Statistics
 from spacy.tokens import Doc, Token
+from spacy.attrs import DEP, POS, HEAD
+from spacy.symbols import NOUN, PROPN, VERB, AUX, ADJ, ADV, CCONJ
+from spacy.strings import StringStore
 from logging import Logger
+from typing import Callable
+from collections.abc import Iterator
+import numpy as np
 
 
 #### CONSTANTS ###############################
 SVP_DELIMITER = ''
 PER_GENDER_MAPPING = {'PER:M':'PER:männlich', 'PER:F':'PER:weiblich'}
-TARGET_POS = {'NOUN', 'PROPN'}
+TARGET_POS = frozenset({NOUN, PROPN})
+
+# integer IDs of the used dependency labels (the same in every ``Vocab``), compared against ``Token.dep``
+_labels = StringStore()
+NG, NK, PD, OC, SB, RC, CJ, CD, SVP, MO = (_labels.add(label) for label in ('ng', 'nk', 'pd', 'oc', 'sb', 'rc', 'cj', 'cd', 'svp', 'mo'))
+
+if not Token.has_extension('is_nom'): Token.set_extension('is_nom', default=None)
 
 
 #### FUNC DEFINITIONS ########################
@@ -32,13 +44,13 @@ def obtain_gender_occurrences(t:Token, logger:Logger) -> dict[str,int]:
 
     # gender for starting target ``t``
     if g := t._.gender:
-        logger.debug(f"\tDESCR_PRN: {t} --- {t._.gender}")
+        logger.debug("\tDESCR_PRN: %s --- %s", t, g)
         if g == 'PRN:F':
             female_occurrences += 1
         elif g == 'PRN:M':
             male_occurrences += 1                            
     elif t.ent_type_.startswith('PER:'):
-        logger.debug(f"\tDESCR_PER: {t} --- {t.ent_type_}")
+        logger.debug("\tDESCR_PER: %s --- %s", t, t.ent_type_)
         g = t.ent_type_
         if g == PER_GENDER_MAPPING['PER:F']:
             female_occurrences += 1
@@ -48,41 +60,56 @@ def obtain_gender_occurrences(t:Token, logger:Logger) -> dict[str,int]:
             undetermined += 1
 
     # iterate over a possible conjunctions that ``t`` is a part of
+    for child in _walk_conjuncts(t, lambda c: c.pos in TARGET_POS and is_nom(c)):
+        if g := child._.gender: 
+            logger.debug("\tDESCR_PRN_c: %s --- %s", child, g)
+            if g == 'PRN:F':
+                female_occurrences += 1
+            elif g == 'PRN:M':
+                male_occurrences += 1 
+            else:
+                break
+        elif child.ent_type_.startswith('PER:'):
+            logger.debug("\tDESCR_PER_c: %s --- %s", child, child.ent_type_)
+            g = child.ent_type_
+            if g == PER_GENDER_MAPPING['PER:F']:
+                female_occurrences += 1
+            elif g == PER_GENDER_MAPPING['PER:M']:
+                male_occurrences += 1
+            elif g == 'PER:NA' or g == 'PER:AMB':
+                undetermined += 1
+            else:
+                break
+    
+    return {'f':female_occurrences, 'm':male_occurrences, 'ud':undetermined}
+    
+
+def _walk_conjuncts(t:Token, accept:Callable[[Token],bool]) -> Iterator[Token]:
+    """
+    Walks along a possible conjunction that ``t`` is a part of, following conjuncts (``cj``) accepted by ``accept`` and coordinating conjunctions (``cd``).
+
+    Args:
+        t (Token): Token to start from.
+        accept (Callable[[Token],bool]): Returns true for conjuncts to follow.
+
+    Yields:
+        Iterator[Token]: Accepted conjuncts in the order they are reached; stop iterating to end the walk early.
+    """
     new_children = True
     tk = t
     while new_children:
         new_children = False
         for child in tk.children:
-            if child.dep_ == 'cj' and child.pos_ in TARGET_POS and is_nom(child, logger):
+            if child.dep == CJ and accept(child):
+                yield child
                 new_children = True
                 tk = child
-                if g := child._.gender: 
-                    logger.debug(f"\tDESCR_PRN_c: {tk} --- {tk._.gender}")
-                    if g == 'PRN:F':
-                        female_occurrences += 1
-                    elif g == 'PRN:M':
-                        male_occurrences += 1 
-                    else:
-                        new_children = False                           
-                elif child.ent_type_.startswith('PER:'):
-                    logger.debug(f"\tDESCR_PER_c: {tk} --- {tk.ent_type_}")
-                    g = child.ent_type_
-                    if g == PER_GENDER_MAPPING['PER:F']:
-                        female_occurrences += 1
-                    elif g == PER_GENDER_MAPPING['PER:M']:
-                        male_occurrences += 1
-                    elif g == 'PER:NA' or g == 'PER:AMB':
-                        undetermined += 1
-                    else:
-                        new_children = False
                 break
-            elif child.dep_ == 'cd' and child.pos_ == 'CCONJ':
+            elif child.dep == CD and child.pos == CCONJ:
                 new_children = True
                 tk = child
-                break   
-    
-    return {'f':female_occurrences, 'm':male_occurrences, 'ud':undetermined}
-    
+                break
+
 
 def parse_descriptors(doc:Doc, statistics:Statistics, logger:Logger):
     """
@@ -93,48 +120,53 @@ def parse_descriptors(doc:Doc, statistics:Statistics, logger:Logger):
         statistics (Statistics): Data object to directly save counts to.
         logger (Logger): Instance of used ``Logger``.
     """
-    for token in doc:
+    for i in candidate_tokens(doc):
+        token = doc[int(i)]
         adv = None
         svp = ''
 
+        # attributes of ``token`` and its head used by the checks below
+        head = token.head
+        dep, pos, head_pos = token.dep, token.pos, head.pos
+
         # negation
-        if token.dep_ == 'ng' and token.head.pos_ in {'VERB', 'AUX', 'ADJ'}:
+        if dep == NG and head_pos in {VERB, AUX, ADJ}:
             statistics.descr.num_neg += 1
             continue
         
         # adjective
-        if token.dep_ == 'nk' and token.pos_ == 'ADJ' and token.head.pos_ in TARGET_POS:
-            factors = obtain_gender_occurrences(token.head, logger)
+        if dep == NK and pos == ADJ and head_pos in TARGET_POS:
+            factors = obtain_gender_occurrences(head, logger)
             descriptor = token
 
         # verb or adverb w/ auxilliary verb            
-        elif token.dep_ in {'pd', 'oc'} and token.head.pos_ == 'AUX' and token.pos_ in {'ADV', 'VERB'}:
+        elif dep in {PD, OC} and head_pos == AUX and pos in {ADV, VERB}:
             n = None
-            if token.head.dep_ in {'rc', 'oc'} and token.head.head.pos_ in TARGET_POS and is_nom(token.head.head, logger):
-                logger.debug(f"FOUND rc: {token} -- {token.head} -- {token.head.head}")
-                n = token.head.head
+            if head.dep in {RC, OC} and head.head.pos in TARGET_POS and is_nom(head.head):
+                logger.debug("FOUND rc: %s -- %s -- %s", token, head, head.head)
+                n = head.head
             else: 
-                for c in token.head.children:
-                    if c.pos_ in TARGET_POS and is_nom(c, logger) and c.dep_ in {'sb', 'oc'}:
+                for c in head.children:
+                    if c.pos in TARGET_POS and is_nom(c) and c.dep in {SB, OC}:
                         n = c
                         break
             factors = obtain_gender_occurrences(n, logger)
             descriptor = token
 
         # verb (w/ or w/o adverb)
-        elif token.dep_ == 'sb' and token.head.pos_ == 'VERB' and token.pos_ in TARGET_POS and is_nom(token, logger):
+        elif dep == SB and head_pos == VERB and pos in TARGET_POS and is_nom(token):
             factors = obtain_gender_occurrences(token, logger)
-            if token.head.dep_ == 'oc' and token.head.head.pos_ in {'ADV', 'AUX'}:
-                logger.debug(f"FOUND oc: {token} -- {token.head} -- {token.head.head}")
-                adv = token.head.head
-            for c in token.head.children:
-                if c.dep_ == 'svp' and c.head == token.head:
+            if head.dep == OC and head.head.pos in {ADV, AUX}:
+                logger.debug("FOUND oc: %s -- %s -- %s", token, head, head.head)
+                adv = head.head
+            for c in head.children:
+                if c.dep == SVP and c.head == head:
                     svp = c.lemma_.lower() + SVP_DELIMITER
-                elif not adv and c.dep_ in {'mo', 'oc'} and c.pos_ in {'ADV', 'AUX'}:
-                    logger.debug(f"FOUND adv, {c.dep_}: {token} -- {token.head} -- {c}")
+                elif not adv and c.dep in {MO, OC} and c.pos in {ADV, AUX}:
+                    logger.debug("FOUND adv, %s: %s -- %s -- %s", c.dep_, token, head, c)
                     adv = c
-                    logger.debug(f"ADV FOUND: {adv}")
-            descriptor = token.head
+                    logger.debug("ADV FOUND: %s", adv)
+            descriptor = head
 
         else:
             continue
@@ -147,38 +179,50 @@ def parse_descriptors(doc:Doc, statistics:Statistics, logger:Logger):
         for token in (descriptor, adv):
             if not token: continue
             nested_descr = []
-            new_children = True
-            tk = token
-            while new_children:
-                new_children = False
-                for child in tk.children:
-                    if child.dep_ == 'cj' and (child.pos_ == 'ADJ' or child.pos_ == 'ADV' or child.pos_ == 'VERB'):
-                        svp_c = None
-                        if child.pos_ == 'VERB':
-                            for c in child.children:
-                                if c.dep_ == 'svp' and c.head == child:
-                                    logger.debug(f"FOUND nested svp: {c} -- {c.head}")
-                                    svp_c = c.lemma_.lower() + SVP_DELIMITER 
-                                elif c.dep_ in {'mo', 'oc'} and c.pos_ in {'ADV', 'AUX'}:
-                                    nested_descr.append(c.lemma_.lower())
-                        if svp_c: nested_descr.append(svp_c + child.lemma_.lower())
-                        else: nested_descr.append(child.lemma_.lower())
-                        new_children = True
-                        tk = child
-                        break
-                    elif child.dep_ == 'cd' and child.pos_ == 'CCONJ':
-                        new_children = True
-                        tk = child
-                        break 
+            for child in _walk_conjuncts(token, lambda c: c.pos in {ADJ, ADV, VERB}):
+                svp_c = None
+                if child.pos == VERB:
+                    for c in child.children:
+                        if c.dep == SVP and c.head == child:
+                            logger.debug("FOUND nested svp: %s -- %s", c, c.head)
+                            svp_c = c.lemma_.lower() + SVP_DELIMITER 
+                        elif c.dep in {MO, OC} and c.pos in {ADV, AUX}:
+                            nested_descr.append(c.lemma_.lower())
+                if svp_c: nested_descr.append(svp_c + child.lemma_.lower())
+                else: nested_descr.append(child.lemma_.lower())
         if adv: nested_descr.append(adv.lemma_.lower())
-        if not nested_descr == []: logger.debug(f"NESTED DESCR: {descriptor} -- {nested_descr}")
+        if not nested_descr == []: logger.debug("NESTED DESCR: %s -- %s", descriptor, nested_descr)
 
         descriptor = svp + descriptor.lemma_.lower()
         add_descriptor(descriptor, factors, statistics, logger)
         for descr in nested_descr:
             add_descriptor(descr, factors, statistics, logger)
 
-        
+
+def candidate_tokens(doc:Doc) -> np.ndarray:
+    """
+    Preselects the tokens of ``doc`` that may start a descriptor relation (or a negation) in ``parse_descriptors``.
+    Uses Doc-level arrays of the dependency labels and POS tags of all tokens and their heads instead of accessing them token by token.
+
+    Args:
+        doc (Doc): Textual content to parse.
+
+    Returns:
+        np.ndarray: Indices of the candidate tokens (in ascending order).
+    """
+    arr = doc.to_array([DEP, POS, HEAD])
+    dep, pos = arr[:, 0], arr[:, 1]
+    head_pos = pos[np.arange(len(doc)) + arr[:, 2].astype(np.int64)] # HEAD is the (signed) offset to the head
+
+    mask = (
+        ((dep == NG) & np.isin(head_pos, [VERB, AUX, ADJ]))
+        | ((dep == NK) & (pos == ADJ) & np.isin(head_pos, list(TARGET_POS)))
+        | (np.isin(dep, [PD, OC]) & (head_pos == AUX) & np.isin(pos, [ADV, VERB]))
+        | ((dep == SB) & (head_pos == VERB) & np.isin(pos, list(TARGET_POS)))
+    )
+    return np.flatnonzero(mask)
+
+
 def add_descriptor(descriptor:str, factors:dict[str,int], statistics:Statistics, logger:Logger):
     """
     Adds occurrences and counts for a found descriptor-target relation to ``statistics``.
@@ -189,39 +233,41 @@ def add_descriptor(descriptor:str, factors:dict[str,int], statistics:Statistics,
         statistics (Statistics): Data object to save occurrences and counts to.
         logger (Logger): Instance of used ``Logger``.
     """
-    logger.debug(f"----- {descriptor} -- {factors} -----")
+    logger.debug("----- %s -- %s -----", descriptor, factors)
     f_factor = factors['f']
     m_factor = factors['m']
     ud_factor = factors['ud']
     
-    statistics.descr.female_descriptors[descriptor] = statistics.descr.female_descriptors.get(descriptor, 0) + f_factor
-    statistics.descr.male_descriptors[descriptor] = statistics.descr.male_descriptors.get(descriptor, 0) + m_factor
-    statistics.descr.ud_descriptors[descriptor] = statistics.descr.ud_descriptors.get(descriptor, 0) + ud_factor
+    statistics.descr.female_descriptors[descriptor] += f_factor
+    statistics.descr.male_descriptors[descriptor] += m_factor
+    statistics.descr.ud_descriptors[descriptor] += ud_factor
     
     for key, factor in zip(statistics.descr.num_matches_descr.keys(), (f_factor, m_factor, ud_factor)):
         statistics.descr.num_matches_descr[key] += factor
 
-    try:
-        statistics.glean.female_glean = [a + f_factor*b for a,b in zip(statistics.glean.female_glean, glean_norm_values[descriptor])]
-        statistics.glean.male_glean = [a + m_factor*b for a,b in zip(statistics.glean.male_glean, glean_norm_values[descriptor],)]
-        statistics.glean.ud_glean = [a + ud_factor*b for a,b in zip(statistics.glean.ud_glean, glean_norm_values[descriptor])]
+    if (glean_values := glean_lookup(descriptor)) is not None:
+        statistics.glean.female_glean += f_factor * glean_values
+        statistics.glean.male_glean += m_factor * glean_values
+        statistics.glean.ud_glean += ud_factor * glean_values
 
-    except KeyError:
+    else:
         for key, factor in zip(statistics.glean.glean_not_found.keys(), (f_factor, m_factor, ud_factor)):
             statistics.glean.glean_not_found[key] += factor
         if not (f_factor == 0 and m_factor == 0 and ud_factor == 0):
             logger.info(f"\tGLEAN NOT FOUND: {descriptor}")
 
 
-def is_nom(t:Token, logger:Logger) -> bool:
+def is_nom(t:Token) -> bool:
     """
     Returns true if ``t`` is a nominal object (in the textual context it was extracted from).
+    The result is cached in the token extension ``is_nom``, as the same token may be checked repeatedly.
 
     Args:
         t (Token): Token to check if nominal object.
-        logger (Logger): Instance of used ``Logger``
 
     Returns:
         bool: True if ``t`` is a nominal object; False otherwise.
     """
-    return 'Nom' in t.morph.get('Case')
\ No newline at end of file
+    if t._.is_nom is None:
+        t._.is_nom = 'Nom' in t.morph.get('Case')
+    return t._.is_nom
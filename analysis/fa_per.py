@@ -1,21 +1,54 @@
 #### IMPORTS #################################
+import os
 import sys
 import time
+import atexit
+import sqlite3
+import threading
 from logging import Logger
-from urllib.error import HTTPError
-import pandas as pd
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
 
 from spacy.language import Language
 from spacy.tokens import Doc, Span
 
-from SPARQLWrapper import SPARQLWrapper, JSON#
-from SPARQLWrapper.SPARQLExceptions import EndPointInternalError
-
 from analysis.helper import Statistics
 
 
-# Wikdiata endpoint URL for querying the gender of well-known people
-ENDPOINT_URL = 'https://query.wikidata.org/sparql'
+# endpoint URLs for querying the gender of well-known people: QLever's Wikidata endpoint, falling back to Wikidata's own endpoint
+ENDPOINT_URLS = ['https://qlever.cs.uni-freiburg.de/api/wikidata', 'https://query.wikidata.org/sparql']
+USER_AGENT = f"BT-ObtainGender (yhess@uni-osnabrueck.de) Python/{sys.version_info[0]}.{sys.version_info[1]}"
+
+# HTTP session shared by all queries, so that the connection to the endpoint is kept alive
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent':USER_AGENT, 'Accept':'application/sparql-results+json'})
+
+# ``Statistics.PER`` field counting the names per gender label; names with any other label are counted in ``nh_per``
+PER_BUCKETS = {'PER:weiblich':'female_per', 'PER:männlich':'male_per', 'PER:AMB':'amb_per', 'PER:NA':'ud_per'}
+
+# QLever (unlike Wikidata) does not predefine prefixes
+SPARQL_PREFIXES = """
+PREFIX wd: <http://www.wikidata.org/entity/>
+PREFIX wdt: <http://www.wikidata.org/prop/direct/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+"""
+
+MAX_CONCURRENT_QUERIES = 5  # Wikidata allows only a few parallel queries per client
+MAX_ATTEMPTS = 5            # attempts per query if the endpoint fails
+MAX_BACKOFF = 60            # maximum waiting time (in seconds) between attempts
+ENDPOINT_COOLDOWN = 300     # time (in seconds) for which an endpoint that failed is skipped (see ``query_endpoints``)
+
+# endpoints (but the last) that failed, mapped to the time they failed at
+failed_endpoints = {}
+
+# cache of the gender obtained per name; persisted across runs in the SQLite database at GENDER_CACHE_PATH (see ``setup``)
+GENDER_CACHE_PATH = 'data/cache/gender.sqlite'
+gender_cache = {}
+gender_db_path = None   # set by ``setup``; the database itself is opened on first use (see ``_open_gender_db``)
+gender_db = None
+gender_db_lock = threading.Lock()
 
 
 #### FUNC DEFINITIONS ########################
@@ -30,134 +63,406 @@ def count_per(doc:Doc, statistics:Statistics, logger:Logger) -> None:
         logger (Logger): ``Logger`` to use for logging.
     """
     for ent in doc.ents:
-        if not ent.label_.startswith('PER:'): continue
-        #logger.debug(f"\t{ent.text:-<60}{ent.label_:->8}")
-        for label, value in statistics.per.num_matches_per.items():
-            if ent.label_ == label:
-                statistics.per.num_matches_per[label] = value + 1
-        statistics.per.female_per[ent.text] = statistics.per.female_per.get(ent.text, 0) + (ent.label_ == 'PER:weiblich')
-        statistics.per.male_per[ent.text] = statistics.per.male_per.get(ent.text, 0) + (ent.label_ == 'PER:männlich')
-        statistics.per.amb_per[ent.text] = statistics.per.amb_per.get(ent.text, 0) + (ent.label_ == 'PER:AMB')
-        statistics.per.nh_per[ent.text + ' {' + ent.label_ + '}'] = statistics.per.nh_per.get(ent.text + ' {' + ent.label_ + '}', 0) + (ent.label_ not in {'PER:weiblich', 'PER:männlich', 'PER:NA', 'PER:AMB'})
-        statistics.per.ud_per[ent.text] = statistics.per.ud_per.get(ent.text, 0) + (ent.label_ == 'PER:NA')
-
-        if (ent.label_ not in {'PER:weiblich', 'PER:männlich', 'PER:NA', 'PER:AMB'}):
-            logger.info(f"FOUND non-heteronormative per: {ent.text} --- {ent.label_}")
-
-def get_wikidata_results(endpoint_url:str, query:str) -> pd.DataFrame:
+        label = ent.label_
+        if not label.startswith('PER:'): continue
+        #logger.debug(f"\t{ent.text:-<60}{label:->8}")
+        if bucket := PER_BUCKETS.get(label):
+            statistics.per.num_matches_per[label] += 1
+            per = getattr(statistics.per, bucket)
+            key = ent.text
+        else:
+            per = statistics.per.nh_per
+            key = ent.text + ' {' + label + '}'
+            logger.info(f"FOUND non-heteronormative per: {ent.text} --- {label}")
+        per[key] += 1
+
+def get_wikidata_results(endpoint_url:str, query:str, max_attempts:int=MAX_ATTEMPTS) -> list[dict[str,str]]:
     """
     Gets matching entries on Wikidata for specified ``query``.
+    Retries with exponential backoff (or as long as requested by the endpoint's ``Retry-After`` header) if the endpoint fails, e.g., because of rate limiting.
 
     Args:
         endpoint_url (str): URL to Wikidata query API.
         query (str): Wikidata SPARQL query.
+        max_attempts (int, optional): Number of attempts before giving up. Defaults to ``MAX_ATTEMPTS``.
 
     Returns:
-        pd.DataFrame: Table of matching Wikidata entries with the columns specified in the ``query``.
+        list[dict[str,str]]: Matching Wikidata entries, each mapping the variables specified in the ``query`` to their values.
+
+    Raises:
+        requests.RequestException: If all ``max_attempts`` attempts failed.
     """
-    user_agent = f"BT-ObtainGender (yhess@uni-osnabrueck.de) Python/{sys.version_info[0]}.{sys.version_info[1]}"
-    sparql = SPARQLWrapper(endpoint_url, agent=user_agent)
-    sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
-    sparql.addExtraURITag
-    result = sparql.query().convert()
-    return pd.json_normalize(result['results']['bindings'])
+    for attempt in range(max_attempts):
+        try:
+            response = SESSION.post(endpoint_url, data={'query':SPARQL_PREFIXES + query, 'format':'json'}, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+            break
+        except requests.RequestException as e:
+            # do not retry queries rejected by the endpoint
+            status = e.response.status_code if e.response is not None else None
+            if attempt == max_attempts - 1 or (status and 400 <= status < 500 and status != 429):
+                raise
+            time.sleep(retry_delay(e, attempt))
+    return [{var:binding['value'] for var, binding in b.items()} for b in result['results']['bindings']]
+
+
+def query_endpoints(query:str) -> list[dict[str,str]]:
+    """
+    Gets matching entries for specified ``query`` from the first of ``ENDPOINT_URLS`` that answers it.
+    Each endpoint but the last is tried only once; if it is unreachable (connection error, timeout, or server error), it is skipped for ``ENDPOINT_COOLDOWN`` seconds.
+    Only the last endpoint is retried with backoff (see ``get_wikidata_results``).
+
+    Args:
+        query (str): Wikidata SPARQL query.
 
+    Returns:
+        list[dict[str,str]]: Matching Wikidata entries (see ``get_wikidata_results``).
 
-def gender_unambiguous(s:pd.Series) -> bool:
+    Raises:
+        requests.RequestException: If all endpoints failed.
+    """
+    for endpoint_url in ENDPOINT_URLS[:-1]:
+        if time.monotonic() - failed_endpoints.get(endpoint_url, -ENDPOINT_COOLDOWN) < ENDPOINT_COOLDOWN:
+            continue
+        try:
+            return get_wikidata_results(endpoint_url, query, max_attempts=1)
+        except requests.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is None or status >= 500:
+                failed_endpoints[endpoint_url] = time.monotonic()
+    return get_wikidata_results(ENDPOINT_URLS[-1], query)
+
+
+def gender_label(row:dict[str,str]) -> str:
     """
-    Returns if the gender values listed in ``s`` are all equal, i.e., unambiguous.
+    Returns the gender label of a query result ``row``.
 
     Args:
-        s (pd.Series): A series of gender values.
+        row (dict[str,str]): Matching Wikidata entry with the variables ``?gender`` and (optionally) ``?genderLabel``.
+
+    Returns:
+        str: ``f'PER:{gender}'`` with the German label of the gender or, if there is none, its Wikidata ID.
+    """
+    return 'PER:' + row.get('genderLabel', row['gender'].rsplit('/', 1)[-1])
+
+
+def retry_delay(error:Exception, attempt:int) -> float:
+    """
+    Returns how long to wait before the next attempt of a failed query.
+
+    Args:
+        error (Exception): Error raised by the failed attempt.
+        attempt (int): Number of the failed attempt (starting at 0).
+
+    Returns:
+        float: Waiting time in seconds: as requested by the ``Retry-After`` header if present, ``2 ** attempt`` (at most ``MAX_BACKOFF``) otherwise.
+    """
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after)
+    return min(MAX_BACKOFF, 2 ** attempt)
+
+
+def gender_unambiguous(genders:list[str]) -> bool:
+    """
+    Returns if the gender values listed in ``genders`` are all equal, i.e., unambiguous.
+
+    Args:
+        genders (list[str]): A list of gender values.
 
     Returns:
         bool: ``True`` if listed values are all equal.
     """
-    a = s.to_numpy()
-    return (a[0] == a).all()
+    return len(set(genders)) <= 1
+
+
+def first_order_literals(name:list[str]) -> tuple[list[str],list[str]]:
+    """
+    Forms the (German) literals of possible surnames and given names of ``name`` used in the first order query.
+
+    Args:
+        name (list[str]): Name of person split into its parts.
+
+    Returns:
+        tuple[list[str],list[str]]: Literals of possible surnames and of possible given names.
+    """
+    safe = [n.replace('"', '') for n in name]
+    surnames = [f'"{n}"@de' for n in safe[1:]] or ['""@de']
+    # surnames with (lowercase) particles, e.g., "von der Leyen"; as before, the last two parts of any longer name are also tried as one surname
+    if len(safe) > 2:
+        particle = safe[-3] + ' ' if safe[-3].islower() else ''
+        surnames.append(f'"{particle}{safe[-2]} {safe[-1]}"@de')
+    given_names = [f'"{n}"@de' for n in safe[:-1]] or ['""@de']
+    return surnames, given_names
+
+
+def cached_gender(name_str:str) -> str|None:
+    """
+    Looks up the gender of ``name_str`` in ``gender_cache`` and, if not found there, in the persisted gender cache.
+
+    Args:
+        name_str (str): Name of person to look up.
+
+    Returns:
+        str|None: Gender information (see ``obtain_gender``); None if not cached.
+    """
+    if name_str in gender_cache:
+        return gender_cache[name_str]
+    if gender_db_path is None:
+        return None
+
+    with gender_db_lock:
+        row = _open_gender_db().execute('SELECT label FROM gender WHERE name=?', (name_str,)).fetchone()
+    if row:
+        gender_cache[name_str] = row[0]
+        return row[0]
+    return None
+
+
+def _open_gender_db() -> sqlite3.Connection:
+    """
+    Returns the connection to the persisted gender cache at ``gender_db_path``, opening it on first use (the caller holds ``gender_db_lock``).
+    Opening it lazily keeps the connection out of spaCy's worker processes, which are forked once ``nlp.pipe`` starts (before the first lookup).
+
+    Returns:
+        sqlite3.Connection: Connection to the persisted gender cache.
+    """
+    global gender_db
+    if gender_db is None:
+        gender_db = sqlite3.connect(gender_db_path, isolation_level=None, check_same_thread=False)
+        gender_db.execute('PRAGMA journal_mode=WAL')
+        gender_db.execute('CREATE TABLE IF NOT EXISTS gender (name TEXT PRIMARY KEY, label TEXT, ts INTEGER)')
+        atexit.register(gender_db.close)
+    return gender_db
+
+
+def cache_gender(name_str:str, gender:str):
+    """
+    Saves the gender of ``name_str`` to ``gender_cache`` and to the persisted gender cache.
+
+    Args:
+        name_str (str): Name of person.
+        gender (str): Gender information (see ``obtain_gender``).
+    """
+    gender_cache[name_str] = gender
+    if gender_db_path is None:
+        return
+
+    with gender_db_lock:
+        _open_gender_db().execute('INSERT OR REPLACE INTO gender (name, label, ts) VALUES (?, ?, ?)', (name_str, gender, int(time.time())))
+
+
+def obtain_genders(names:set[str], logger:Logger=None):
+    """
+    Obtains the gender for several ``names`` at once via (at most) two batched Wikidata queries and saves it via ``cache_gender``.
+    Each batched query is a union of the queries of ``query_gender``, one subquery per name with its own ``LIMIT``, so a name with many matching entries cannot crowd out the others;
+    the results are assigned to the names via ``?key`` (first order) and ``?prefLabel`` (second order).
+
+    Args:
+        names (set[str]): Names of people for whom gender information shall be obtained.
+        logger (Logger, optional): Instance of used ``Logger``. Defaults to None.
+    """
+    names = [n for n in names if cached_gender(n) is None and len(n.split()) <= 12]
+    if not names:
+        return
+
+    # first order query (``?key`` identifies the name a result belongs to)
+    subqueries = []
+    for key, name_str in enumerate(names):
+        surnames, given_names = first_order_literals(name_str.split())
+        subqueries.append(f"""{{
+        SELECT ("{key}" AS ?key) ?item ?gender ?genderLabel
+        WHERE {{
+            ?item wdt:P31 wd:Q5.
+            
+            VALUES ?p2 {{ wdt:P734 }}
+            VALUES ?surname {{ {' '.join(surnames)} }}
+            ?item ?p2 ?partial2 .
+            ?partial2 rdfs:label|skos:altLabel ?surname .
+
+            VALUES ?p {{ wdt:P735 wdt:P1449 wdt:P742 }}
+            VALUES ?name {{ {' '.join(given_names)} }}
+            ?item ?p ?partial .
+            ?partial rdfs:label|skos:altLabel ?name .
+
+            ?item wdt:P21 ?gender .
+                
+            OPTIONAL {{ ?gender rdfs:label ?genderLabel FILTER(LANG(?genderLabel) = 'de') }}
+        }}
+        LIMIT 100
+    }}""")
+
+    query = f"""
+    SELECT ?key ?item ?gender ?genderLabel
+    WHERE {{
+    {' UNION '.join(subqueries)}
+    }}
+    """
+    rows_by_key = defaultdict(list)
+    for row in query_endpoints(query):
+        rows_by_key[row['key']].append(row)
+
+    unresolved = []
+    for key, name_str in enumerate(names):
+        rows = rows_by_key.get(str(key))
+        if rows and gender_unambiguous([row['gender'] for row in rows]):
+            cache_gender(name_str, gender_label(rows[0]))
+        else:
+            unresolved.append(name_str)
+    if not unresolved:
+        return
+
+    # second order query
+    labels = [n.replace('"', '') for n in unresolved]
+    subqueries = [f"""{{
+        SELECT ?item ?prefLabel ?gender ?genderLabel
+        WHERE {{
+            ?item wdt:P31 wd:Q5.
+                
+            VALUES ?prefLabel {{"{label}"@de "{label}"@en}}
+            ?item rdfs:label|skos:altLabel ?prefLabel .
+            
+            ?item wdt:P21 ?gender .
+
+            OPTIONAL {{ ?gender rdfs:label ?genderLabel FILTER(LANG(?genderLabel) = 'de') }}
+        }}
+        LIMIT 100
+    }}""" for label in labels]
+    query = f"""
+    SELECT ?item ?prefLabel ?gender ?genderLabel
+    WHERE {{
+    {' UNION '.join(subqueries)}
+    }}
+    """
+    rows_by_label = defaultdict(list)
+    for row in query_endpoints(query):
+        rows_by_label[row['prefLabel']].append(row)
+
+    for name_str, label in zip(unresolved, labels):
+        if rows := rows_by_label.get(label):
+            cache_gender(name_str, gender_label(rows[0]) if gender_unambiguous([row['gender'] for row in rows]) else 'PER:AMB')
+            continue
+
+        # if no result, try (once) without potential possessive s
+        gender = (cached_gender(name_str[:-1]) or query_gender(name_str[:-1]) or 'PER:NA') if name_str.endswith('s') else 'PER:NA'
+        if logger and gender == 'PER:NA':
+            logger.info(f"\tUNRESOLVED named entity not found: {name_str}")
+        cache_gender(name_str, gender)
 
 
 def obtain_gender(name_str:str, logger:Logger=None) -> str:
     """
-    Forms Wikidata queries to obtain gender based on ``name_str``.
+    Obtains gender based on ``name_str`` (see ``query_gender``) and saves it via ``cache_gender``.
+    If the name is not found and ends with s, it is tried once more without the potential possessive s.
 
     Args:
         name_str (str): Name of person for whom gender information shall be obtained.
         logger (Logger, optional): Instance of used ``Logger``. Defaults to None.
 
     Returns:
-        str: Gender information: ``f'PER:{gender}'`` if unambiguous ``'PER:NA'`` otherwise.
+        str: Gender information: ``f'PER:{gender}'`` if unambiguous, ``'PER:AMB'`` if ambiguous, ``'PER:NA'`` otherwise.
     """    
-    gender = 'PER:NA'
+    if (gender := cached_gender(name_str)) is not None:
+        return gender
 
-    name = name_str.split()
-    if len(name) > 12: 
+    if len(name_str.split()) > 12: 
         if logger: logger.info(f"\tUNRESOLVED name exceeds maximum length (12): {name_str}")
-        return gender
-    
+        return 'PER:NA'
+
+    candidates = [name_str, name_str[:-1]] if name_str.endswith('s') else [name_str]
+    for candidate in candidates:
+        gender = cached_gender(candidate) if candidate != name_str else None
+        if gender is None:
+            gender = query_gender(candidate) or 'PER:NA'
+        if gender != 'PER:NA':
+            break
+    else:
+        if logger: logger.info(f"\tUNRESOLVED named entity not found: {name_str}")
+
+    cache_gender(name_str, gender)
+    return gender
+
+
+def query_gender(name_str:str) -> str|None:
+    """
+    Forms Wikidata queries to obtain gender based on ``name_str``.
+
+    Args:
+        name_str (str): Name of person for whom gender information shall be obtained.
+
+    Returns:
+        str|None: Gender information: ``f'PER:{gender}'`` if unambiguous, ``'PER:AMB'`` if ambiguous, None if the name is not found.
+    """
     # first order query
+    surnames, given_names = first_order_literals(name_str.split())
     query = f"""
-    SELECT ?item ?itemLabel ?gender ?genderLabel
+    SELECT ?item ?gender ?genderLabel
     WHERE {{
         ?item wdt:P31 wd:Q5.
         
         VALUES ?p2 {{ wdt:P734 }}
-        VALUES ?surname {{ {' '.join([f'''"{n.replace('"', '')}"@de''' for n in name[1:]] if len(name) > 1 else ['""@de'])}{f''' "{name[-3].replace('"', '') + ' ' if name[-3].islower() else ''}{name[-2].replace('"', '')} {name[-1].replace('"', '')}"@de''' if len(name) > 2 and (name[-2].islower() or name[-3].islower) else ''} }}
+        VALUES ?surname {{ {' '.join(surnames)} }}
         ?item ?p2 ?partial2 .
         ?partial2 rdfs:label|skos:altLabel ?surname .
 
         VALUES ?p {{ wdt:P735 wdt:P1449 wdt:P742 }}
-        VALUES ?name {{ {' '.join([f'''"{n.replace('"', '')}"@de''' for n in name[:-1]] if len(name) > 1 else ['""@de'])} }}
+        VALUES ?name {{ {' '.join(given_names)} }}
         ?item ?p ?partial .
         ?partial rdfs:label|skos:altLabel ?name .
 
         ?item wdt:P21 ?gender .
             
-        SERVICE wikibase:label {{ bd:serviceParam wikibase:language "[AUTO_LANGUAGE],de". }}
+        OPTIONAL {{ ?gender rdfs:label ?genderLabel FILTER(LANG(?genderLabel) = 'de') }}
     }}
     LIMIT 100
     """
 
-    wd_results = get_wikidata_results(ENDPOINT_URL, query)
+    wd_results = query_endpoints(query)
+    genders = [row['gender'] for row in wd_results]
 
     # second order query
-    if wd_results.empty or not gender_unambiguous(wd_results['gender.value']):
+    if not genders or not gender_unambiguous(genders):
+        label = name_str.replace('"', '')
         query = f"""
-        SELECT ?item ?itemLabel ?prefLabel ?gender ?genderLabel
+        SELECT ?item ?prefLabel ?gender ?genderLabel
         WHERE {{
             ?item wdt:P31 wd:Q5.
                 
-            VALUES ?prefLabel {{"{name_str.replace('"', '')}"@de "{name_str.replace('"', '')}"@en}}
+            VALUES ?prefLabel {{"{label}"@de "{label}"@en}}
             ?item rdfs:label|skos:altLabel ?prefLabel .
             
             ?item wdt:P21 ?gender .
 
-            SERVICE wikibase:label {{ bd:serviceParam wikibase:language "[AUTO_LANGUAGE],de". }}
+            OPTIONAL {{ ?gender rdfs:label ?genderLabel FILTER(LANG(?genderLabel) = 'de') }}
         }}
         LIMIT 100
         """
-        wd_results = get_wikidata_results(ENDPOINT_URL, query)
-  
-    # if unambiguous, create return string
-    if (not wd_results.empty) and gender_unambiguous(wd_results['gender.value']):
-        gender = 'PER:' + wd_results.iloc[0]['genderLabel.value'] 
-    
-    # if ambiguous, create 'PER:AMB' as return string
-    elif (not wd_results.empty) and (not gender_unambiguous(wd_results['gender.value'])):
-        gender = 'PER:AMB'
-
-    # if no result, try without potential possessive s
-    elif gender == 'PER:NA' and name_str[-1] == 's':
-        gender = obtain_gender(name_str[:-1], logger)
-
-    if logger:
-        if gender == 'PER:NA' and wd_results.empty:
-            logger.info(f"\tUNRESOLVED named entity not found: {name_str}")
-        elif gender == 'PER:NA' and not gender_unambiguous(wd_results['gender.value']):
-            logger.info(f"\tUNRESOLVED gender ambiguous: {name_str}")
-    
-    return gender
+        wd_results = query_endpoints(query)
+        genders = [row['gender'] for row in wd_results]
+
+    if not genders:
+        return None
+    return gender_label(wd_results[0]) if gender_unambiguous(genders) else 'PER:AMB'
+
+
+def obtain_gender_or_na(name_str:str, logger:Logger) -> str:
+    """
+    Calls ``obtain_gender`` and falls back to ``'PER:NA'`` if the Wikidata endpoint still fails after all attempts of ``get_wikidata_results``.
+
+    Args:
+        name_str (str): Name of person for whom gender information shall be obtained.
+        logger (Logger): Instance of used ``Logger``.
+
+    Returns:
+        str: Gender information (see ``obtain_gender``); ``'PER:NA'`` if all attempts failed.
+    """
+    try:
+        return obtain_gender(name_str, logger)
+    except requests.RequestException as e:
+        logger.warning(f"SPARQL query failed: {name_str} --- {e}")
+        return 'PER:NA'
 
 
 @Language.component('gender_ner')
@@ -171,29 +476,37 @@ def gender_ner(doc:Doc) -> Doc:
     Returns:
         Doc: Gender NER annotated ``Doc`` object.
     """
-    new_ents = []
-    for old_ent in doc.ents:
-        if old_ent.label_ == 'PER':
-            try:
-                new_ent = Span(doc, old_ent.start, old_ent.end, obtain_gender(old_ent.text, doc._.logger))
-            except (EndPointInternalError, HTTPError):
-                time.sleep(60000)
-                try:
-                    new_ent = Span(doc, old_ent.start, old_ent.end, obtain_gender(old_ent.text, doc._.logger))
-                except (EndPointInternalError, HTTPError) as e:
-                    doc._.logger.warning(f"SPARQL EndPointInternalError/HTTPError (Timeout): {old_ent} --- {e}")
-                    new_ent = Span(doc, old_ent.start, old_ent.end, 'PER:NA')
-            new_ents.append(new_ent)
+    names = {ent.text for ent in doc.ents if ent.label_ == 'PER'}
+    try:
+        obtain_genders(names, doc._.logger)
+    except requests.RequestException as e:
+        doc._.logger.warning(f"SPARQL batch query failed, obtaining gender name by name: {e}")
+
+    # resolve the remaining names (e.g., if the batched query failed) with concurrent queries
+    genders = {name:gender for name in names if (gender := cached_gender(name)) is not None}
+    if unresolved := [name for name in names if name not in genders]:
+        with ThreadPoolExecutor(MAX_CONCURRENT_QUERIES) as executor:
+            genders.update(zip(unresolved, executor.map(lambda name: obtain_gender_or_na(name, doc._.logger), unresolved)))
+
+    new_ents = [Span(doc, ent.start, ent.end, genders[ent.text]) for ent in doc.ents if ent.label_ == 'PER']
     doc.ents = new_ents
     return doc
 
 
-def setup(logger:Logger):
+def setup(logger:Logger, cache_path:str=GENDER_CACHE_PATH):
     """
     Helps with setting up the gender-ner-annotating ``spacy`` pipeline component 'gender_ner'.
     Initializes the ``Doc`` extension ``logger`` used by 'gender_ner'.
+    Sets up the SQLite database at ``cache_path`` that persists the genders obtained across runs (opened on first use).
 
     Args:
         logger (Logger): `Logger`` to use for logging
+        cache_path (str, optional): File path of the persisted gender cache; if None the cache is not persisted. Defaults to GENDER_CACHE_PATH.
     """
+    global gender_db_path
     Doc.set_extension('logger', default=logger)
+
+    if cache_path and gender_db_path is None:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        gender_db_path = cache_path
+        logger.info(f"USING gender cache {cache_path}")
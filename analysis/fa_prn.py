@@ -1,14 +1,34 @@
 #### IMPORTS #################################
 from logging import Logger
-import pandas as pd
+import numpy as np
 
 from spacy.language import Language
 from spacy.tokens import Doc, Token
+from spacy.attrs import LEMMA, POS
+from spacy.symbols import NOUN, PROPN
+from spacy.strings import StringStore
 
 from analysis.helper import Statistics, PRN_LIST_INDICATOR_FEMALE, PRN_LIST_INDICATOR_MALE
 
 
 #### FUNC DEFINITIONS ########################
+def prn_lemmas(doc:Doc) -> tuple[np.ndarray,np.ndarray,np.ndarray]:
+    """
+    Determines the PRNs in ``doc`` as annotated by 'gender_prn', but via the Doc-level array of lemma and POS IDs instead of token by token.
+
+    Args:
+        doc (Doc): ``spacy.tokens.Doc`` for which PRNs shall be determined.
+
+    Returns:
+        tuple[np.ndarray,np.ndarray,np.ndarray]: Lemma IDs of the nouns and proper nouns in ``doc`` and masks of those that are female and male PRNs.
+    """
+    arr = doc.to_array([LEMMA, POS])
+    lemmas = arr[np.isin(arr[:, 1], [NOUN, PROPN]), 0]
+    is_male = np.isin(lemmas, doc._.prn_male_ids)
+    is_female = ~is_male & np.isin(lemmas, doc._.prn_female_ids)
+    return lemmas, is_female, is_male
+
+
 def count_prn(doc:Doc, statistics:Statistics=None, logger:Logger=None) -> dict[str,int]:
     """
     Count female and male people-related nouns (PRNs) based on custom annotations in ``doc``. 
@@ -22,24 +42,23 @@ def count_prn(doc:Doc, statistics:Statistics=None, logger:Logger=None) -> dict[s
     Returns:
         dict[str,int]: ``dict`` with counts of female and male PRNs.
     """
+    lemmas, is_female, is_male = prn_lemmas(doc)
+
     if statistics:
-        for token in doc:
-            if g := token._.gender:
-                #if logger: logger.debug(f"\t{token.text:-<30}{token.lemma_:-<30}{g:->8}")
-                for label, value in statistics.prn.num_matches_prn.items():
-                    if g == label:
-                        statistics.prn.num_matches_prn[label] = value + 1
-                statistics.prn.female_prn[token.lemma_] = statistics.prn.female_prn.get(token.lemma_, 0) + (g == 'PRN:F')
-                statistics.prn.male_prn[token.lemma_] = statistics.prn.male_prn.get(token.lemma_, 0) + (g == 'PRN:M')
+        for label, mask, prns in (('PRN:F', is_female, statistics.prn.female_prn), ('PRN:M', is_male, statistics.prn.male_prn)):
+            ids, first, counts = np.unique(lemmas[mask], return_index=True, return_counts=True)
+            statistics.prn.num_matches_prn[label] += int(counts.sum())
+            # in order of first occurrence
+            for i in np.argsort(first):
+                lemma = doc.vocab.strings[int(ids[i])]
+                prns[lemma] += int(counts[i])
         return {'PRN:F':statistics.prn.num_matches_prn['PRN:F'], 'PRN:M':statistics.prn.num_matches_prn['PRN:M']}
     else:
-        num_matches_prn = {'PRN:F':0, 'PRN:M':0}
-        for token in doc:
-            if g := token._.gender:
-                if logger: logger.debug(f"\t{token.text:-<30}{token.lemma_:-<30}{g:->8}")
-                for label in num_matches_prn.keys():
-                    num_matches_prn[label] += (g == label)
-        return num_matches_prn 
+        if logger:
+            for token in doc:
+                if g := token._.gender:
+                    logger.debug(f"\t{token.text:-<30}{token.lemma_:-<30}{g:->8}")
+        return {'PRN:F':int(is_female.sum()), 'PRN:M':int(is_male.sum())}
 
 
 @Language.component('gender_prn')
@@ -67,26 +86,28 @@ def gender_prn(doc:Doc) -> Doc:
 def setup(path_prn_list:str, logger:Logger) -> None:
     """
     Helps with setting up the prn-annotating ``spacy`` pipeline component 'gender_prn'.
-    Initializes the ``Doc`` extensions ``prn_female`` and ``prn_male`` used by 'gender_prn'.
+    Initializes the ``Doc`` extensions ``prn_female`` and ``prn_male`` used by 'gender_prn' (and their lemma IDs ``prn_female_ids`` and ``prn_male_ids`` used by ``count_prn``).
 
     Args:
         path_prn_list (str): Path to comma separated PRN list with 'w' and 'm' as gender specifiers.
         logger (Logger): `Logger`` to use for logging.
     """
-    prn_male = []
-    prn_female = []
-
-    # read in pre-compiled list of people-related nouns
-    with open(path_prn_list, mode='r', encoding='utf-8') as file:
-        reader = pd.read_csv(file, comment='#').to_numpy()
-        for row in reader:
-            if row[0] == PRN_LIST_INDICATOR_FEMALE:
-                prn_female.append(row[1])
-            elif row[0] == PRN_LIST_INDICATOR_MALE:
-                prn_male.append(row[1])
-            else:
-                logger.warning(f"unknown gender specifier in prn-list: {row[0]} for word {row[1]}")
-    
-    Doc.set_extension('prn_female', default=prn_female)
-    Doc.set_extension('prn_male', default=prn_male)
+    import pandas as pd  # only needed here; imported lazily to keep importing this module (e.g., in spaCy worker processes) cheap
+
+    # read in pre-compiled list of people-related nouns (the third column lists the sources); as before, its first row is read as the header (and replaced by ``names``)
+    prn_list = pd.read_csv(path_prn_list, comment='#', header=0, names=['gender', 'word', 'sources'], usecols=['gender', 'word'],
+                           dtype={'gender':'category', 'word':str}, encoding='utf-8')
+    is_female = prn_list['gender'] == PRN_LIST_INDICATOR_FEMALE
+    is_male = prn_list['gender'] == PRN_LIST_INDICATOR_MALE
+    for gender, word in prn_list.loc[~(is_female | is_male)].itertuples(index=False):
+        logger.warning(f"unknown gender specifier in prn-list: {gender} for word {word}")
+    prn_female = set(prn_list.loc[is_female, 'word'])
+    prn_male = set(prn_list.loc[is_male, 'word'])
+
+    Doc.set_extension('prn_female', default=frozenset(prn_female))
+    Doc.set_extension('prn_male', default=frozenset(prn_male))
+    # lemma IDs (the same in every ``Vocab``) of the PRNs used by ``count_prn``
+    strings = StringStore()
+    Doc.set_extension('prn_female_ids', default=np.array([strings.add(prn) for prn in prn_female if isinstance(prn, str)], dtype=np.uint64))
+    Doc.set_extension('prn_male_ids', default=np.array([strings.add(prn) for prn in prn_male if isinstance(prn, str)], dtype=np.uint64))
     Token.set_extension('gender', default=None)
\ No newline at end of file
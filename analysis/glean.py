@@ -1,12 +1,13 @@
 ####  IMPORTS ################################
 import csv
-import pandas as pd
+import numpy as np
 
 
 #### CONSTANTS & GLOABAL VARIABLES ###########
 GLEAN_NV_PATH = 'data/meta/Norm_values_GLEAN.csv'
 
-glean_norm_values = {}
+glean_words = []
+glean_rows = []
 
 
 #### READ IN GLEAN VALUES ####################
@@ -14,19 +15,42 @@ with open(GLEAN_NV_PATH, mode='r', encoding='utf-8') as file:
     reader = csv.reader(file, delimiter=';')
     next(reader, None)
     for row in reader:
-        glean_norm_values[row[0]] = [
+        glean_words.append(row[0])
+        glean_rows.append((
             float(row[1]),     # arousal
             float(row[2]),     # valence
             float(row[3]),     # imageability
             float(row[4])      # concreteness
-        ]
+        ))
+
+# dense lookup: row ``glean_index[word]`` of ``glean_matrix`` holds the norm values of ``word``
+# (for words listed more than once, the last entry is used)
+glean_index = {word:i for i, word in enumerate(glean_words)}
+glean_matrix = np.array(glean_rows, dtype=np.float64).reshape(-1, 4)
+del glean_rows
+
+
+def lookup(word:str) -> np.ndarray:
+    """
+    Looks up the GLEAN norm values of ``word``.
+
+    Args:
+        word (str): Word to look up.
+
+    Returns:
+        np.ndarray: Norm values (arousal, valence, imageability, concreteness) of ``word``; None if ``word`` is not listed.
+    """
+    i = glean_index.get(word)
+    return glean_matrix[i] if i is not None else None
 
 
 #### EXPLORE GLEAN VALUES ####################
 if __name__ == '__main__':
-    glean_df = pd.DataFrame.from_dict(glean_norm_values,
-                                      orient='index',
-                                      columns=['arousal','valence','imageability','concreteness'])
+    import pandas as pd
+
+    glean_df = pd.DataFrame(glean_matrix[list(glean_index.values())],
+                            index=list(glean_index.keys()),
+                            columns=['arousal','valence','imageability','concreteness'])
     
     print('=== STATISTICS =======================================')
     print(glean_df.describe(), '\n')
@@ -35,9 +59,9 @@ if __name__ == '__main__':
 
     print('\n=== SOME EXAMPLES ====================================')
     for word in ['schön', 'paradox', 'windig', 'der', 'Wort', 'alksdjfhalskjfh']:
-        try:
-            print(f"{word:.<30}{[round(v, 2) for v in glean_norm_values[word]]}")
-        except KeyError:
+        if (values := lookup(word)) is not None:
+            print(f"{word:.<30}{[round(v, 2) for v in values.tolist()]}")
+        else:
             print(f"{word:.<30}[no entry]")
 
     print('\n\n=== GLEAN VALUE LOOKUP ===============================')
@@ -1,20 +1,28 @@
 #### IMPORTS #################################
 import re
-import csv
 import json
+import numpy as np
 
 from dataclasses import dataclass, field
+from collections import Counter
 from collections.abc import Iterator
 
+# optional: faster parsing of the article files (``pip install orjson``)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 #### HELPER CONSTANTS ########################
 PRN_LIST_INDICATOR_FEMALE = 'f'
 PRN_LIST_INDICATOR_MALE = 'm'
 
+# first headings of articles that are literature references or imprints (see ``load_text``)
+META_HEADING_RE = re.compile(r'.*Literatur(angaben|hinweise|verzeichnis)?.*|Literatur und Internetadressen|.*Quellen.*|.*Impressum.*')
 
-#### STATISTICS DATA CLASS ###################
-GLEAN_INIT = [0.0, 0.0, 0.0, 0.0]
 
+#### STATISTICS DATA CLASS ###################
 @dataclass
 class Statistics:
     """
@@ -30,21 +38,22 @@ class Statistics:
 
     @dataclass
     class PER:
-        female_per:dict[str,int]
-        male_per:dict[str,int]
-        amb_per:dict[str,int]
-        nh_per:dict[str, int]
-        ud_per:dict[str,int]
-        num_matches_per:dict = field(default_factory=lambda: {'PER:weiblich':0, 'PER:männlich':0, 'PER:NA':0, 'PER:AMB':0})
+        female_per:Counter = field(default_factory=Counter)
+        male_per:Counter = field(default_factory=Counter)
+        amb_per:Counter = field(default_factory=Counter)
+        nh_per:Counter = field(default_factory=Counter)
+        ud_per:Counter = field(default_factory=Counter)
+        num_matches_per:Counter = field(default_factory=lambda: Counter({'PER:weiblich':0, 'PER:männlich':0, 'PER:NA':0, 'PER:AMB':0}))
 
     @dataclass
     class PRN:
-        female_prn:dict[str,int]
-        male_prn:dict[str,int]
-        num_matches_prn:dict = field(default_factory=lambda: {'PRN:F':0, 'PRN:M':0})
+        female_prn:Counter = field(default_factory=Counter)
+        male_prn:Counter = field(default_factory=Counter)
+        num_matches_prn:Counter = field(default_factory=lambda: Counter({'PRN:F':0, 'PRN:M':0}))
     
     @dataclass
     class DESCR:
+        # descriptor counts are expected as ``defaultdict(int)``
         female_descriptors:dict[str,int]
         male_descriptors:dict[str,int]
         ud_descriptors:dict[str,int]
@@ -53,14 +62,15 @@ class Statistics:
 
     @dataclass
     class GLEAN:
-        female_glean:list[float] = field(default_factory=lambda: GLEAN_INIT)
-        male_glean:list[float] = field(default_factory=lambda: GLEAN_INIT)
-        ud_glean:list[float] = field(default_factory=lambda: GLEAN_INIT)
+        # sums of the norm values (arousal, valence, imageability, concreteness); a separate array per field, as they are updated in place
+        female_glean:np.ndarray = field(default_factory=lambda: np.zeros(4))
+        male_glean:np.ndarray = field(default_factory=lambda: np.zeros(4))
+        ud_glean:np.ndarray = field(default_factory=lambda: np.zeros(4))
         glean_not_found:dict = field(default_factory=lambda: {'DESCR:F':0, 'DESCR:M':0, 'DESCR:NA':0})
 
     @dataclass
     class BYD_MW:
-        match_lists:dict[dict[str,int]]
+        match_lists:dict[str,Counter]
         num_matches:dict[str,int]
 
 #### FUNCs FOR HANDLING ARTICLES #############
@@ -74,14 +84,21 @@ def flatten_article(article_dict:dict) -> Iterator[str]:
     Yields:
         Iterator[str]: Iterator over strings (headings and paragraphs).
     """
-    for elem in getattr(article_dict, 'values', lambda: article_dict)():
-        if isinstance(elem, str):
-            yield re.sub('\xad', '', elem)
-        elif isinstance(elem, dict):
-            yield list(elem.keys())[0]
-            yield from flatten_article(elem)
-        elif elem is not None:
-            yield from flatten_article(elem)
+    # explicit stack of iterators over the (nested) dicts and lists instead of recursion
+    stack = [iter(article_dict.values() if isinstance(article_dict, dict) else article_dict)]
+    while stack:
+        for elem in stack[-1]:
+            if isinstance(elem, str):
+                yield elem.replace('\xad', '')
+            elif isinstance(elem, dict):
+                yield next(iter(elem))
+                stack.append(iter(elem.values()))
+                break
+            elif elem is not None:
+                stack.append(iter(elem))
+                break
+        else:
+            stack.pop()
 
 
 def load_text(path:str, include_meta:bool=False) -> list[str]:
@@ -95,12 +112,15 @@ def load_text(path:str, include_meta:bool=False) -> list[str]:
     Returns:
         list[str]: Article content as a flatt list of paragraphs (json hierarchy not maintained).
     """
-    with open(path, mode='r', encoding='utf-8') as file:
-        rt = json.load(file) 
-    if not include_meta and re.match('.*Literatur(angaben|hinweise|verzeichnis)?.*|Literatur und Internetadressen|.*Quellen.*|.*Impressum.*', next(iter(rt))): return None 
-    frt = list(flatten_article(rt))
-    frt.insert(0, list(rt)[0])
-    return frt
+    if orjson:
+        with open(path, mode='rb') as file:
+            rt = orjson.loads(file.read())
+    else:
+        with open(path, mode='r', encoding='utf-8') as file:
+            rt = json.load(file) 
+    title = next(iter(rt))
+    if not include_meta and META_HEADING_RE.match(title): return None 
+    return [title, *flatten_article(rt)]
 
 #### FUNC FOR SAVING TOKEN OCCURRENCES #######
 def write_occurences_to_file(path:str, data:dict[str,int], remove_zero:bool = True, header:list[str] = ['word', 'num_occurrences']):
@@ -113,7 +133,22 @@ def write_occurences_to_file(path:str, data:dict[str,int], remove_zero:bool = Tr
         remove_zero (bool, optional): If true, removes tokens which occur 0 times before writing to file. Defaults to True.
         header (list[str], optional): List of two strings specifying the column names. Defaults to ['word', 'num_occurrences'].
     """
-    with open(path, mode='w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f) 
-        writer.writerow(header)
-        writer.writerows([(k,v) for (k,v) in data.items() if not remove_zero or v>0])
\ No newline at end of file
+    # formatted like ``csv.writer`` (minimal quoting, '\r\n' line terminator) without its per-row overhead
+    with open(path, mode='w', encoding='utf-8', newline='', buffering=1<<20) as f:
+        f.write(f"{csv_field(header[0])},{csv_field(header[1])}\r\n")
+        f.writelines(f"{csv_field(k)},{v}\r\n" for (k,v) in data.items() if not remove_zero or v>0)
+
+
+def csv_field(value:str) -> str:
+    """
+    Quotes ``value`` for a comma separated file if needed (i.e., if it contains a comma, quote or line break).
+
+    Args:
+        value (str): Value of a field.
+
+    Returns:
+        str: Value as written to the file.
+    """
+    if ',' in value or '"' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
\ No newline at end of file
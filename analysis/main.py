@@ -2,16 +2,22 @@
 import sys
 import os
 import re
+import shutil
+import hashlib
+import tempfile
+import threading
 import csv
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Callable, Iterator
 import logging
 import logging.config
+import numpy as np
 
 import spacy
 from spacy.language import Language
 from spacy.tokens import Doc
-from spacy.matcher import Matcher
 
 import coreferee
 
@@ -19,6 +25,7 @@ from analysis.helper import *
 import analysis.fa_per as fa_per
 import analysis.fa_prn as fa_prn
 import analysis.byd_mw as byd_mw
+descr_pars = None   # imported in ``main``, as importing it reads the GLEAN norm values
 
 
 #### CONSTANTS ###############################
@@ -39,10 +46,39 @@ DEBUG_FILE_PATHS = [
     #'ffe363d5-7bc0-3e85-9214-375ac175d50d.json'     # Sicherheit in einer Welt im Umbruch
 ]
 
+# preprocessing (see ``preprocess``)
+DASH_RE = re.compile(r'[–]+')
+SLASH_RE = re.compile(r' ?/ ?[A-Za-z]+')
+
+# number of articles loaded ahead in a background thread (see ``resolve_articles``)
+PREFETCH_ARTICLES = 4
+
+# batched (and for the coreference-resolved paragraphs parallel) annotation of the paragraphs (see ``main``)
+N_PROCESS = max(1, (os.cpu_count() or 2) - 1)
+BATCH_SIZE = 64
+# pipes disabled per pass: tagger, parser, NER and merge_entities are needed by both, coreferee only by the first
+SEQUENTIAL_PIPES = ['gender_ner', 'gender_prn']
+COREF_DISABLED = SEQUENTIAL_PIPES                     # coreference resolution does not need the gender annotations (and thus no Wikidata queries)
+PARALLEL_DISABLED = ['coreferee'] + SEQUENTIAL_PIPES  # coreferences are already resolved
+
 # output
 LOG_PATH = 'analysis/logs/'
 STATS_PATH = 'analysis/stats/'
 VERSION_EXT = '-X1'
+# assembled spaCy pipeline (see ``setup_spacy_pipeline``); keyed by the versions and pipes it is built from (see ``pipeline_cache_key``),
+# so that a changed pipeline is not loaded from an outdated cache
+PIPELINE_CACHE_PATH = f"analysis/cache/pipeline{VERSION_EXT}"
+PIPELINE_MODEL = 'de_core_news_lg'
+PIPELINE_ADDED_PIPES = [('merge_entities', 'ner'), ('coreferee', 'merge_entities'), ('gender_ner', 'coreferee'), ('gender_prn', 'gender_ner')]   # (name, after)
+# columns of the stats table (one row per article, see ``article_info``), followed by the names of the byd_mw patterns
+STATS_TABLE_HEADER = ['article', 'token_num', 'num_slashes',
+                      'num_PER_F', 'num_PER_M', 'num_PER_NA', 'num_PER_AMB',
+                      'num_PRN_F', 'num_PRN_M',
+                      'num_DESCR_F', 'num_DESCR_M', 'num_DESCR_NA', 'num_NEG',
+                      'F_AROU', 'F_VAL', 'F_IMA', 'F_CONC',
+                      'M_AROU', 'M_VAL', 'M_IMA', 'M_CONC',
+                      'UD_AROU', 'UD_VAL', 'UD_IMA', 'UD_CONC',
+                      'num_noGLEAN_F', 'num_noGLEAN_M', 'num_noGLEAN_NA']
 
 
 #### LOGGING #################################
@@ -63,9 +99,9 @@ LOGGING_CONFIG = {
         'file':     {'class': 'logging.FileHandler', 
                      'formatter': "standard", 
                      'level': 'INFO', 
-                     'filename': f"{LOG_PATH}izpb-analyzer_{int(datetime.now(timezone.utc).timestamp())}.log",
                      'mode': 'w',
-                     'encoding': 'UTF-8'} 
+                     'encoding': 'UTF-8',
+                     'delay': True}     # 'filename' is set in ``setup_logging``
     },
     'loggers': { 
         __name__:   {'level': 'INFO', 
@@ -74,18 +110,23 @@ LOGGING_CONFIG = {
     }
 }
 
-if not os.path.isdir(LOG_PATH):
-    os.makedirs(LOG_PATH)
-
-logging.config.dictConfig(LOGGING_CONFIG)
 log = logging.getLogger(__name__)
 
-log.info('IMPORT glean norm values')
-import analysis.descr_pars as descr_pars
+
+def setup_logging():
+    """
+    Configures logging as specified in ``LOGGING_CONFIG``; logs to a new file in ``LOG_PATH`` named after the current time.
+    Called by ``main``, so that importing this module neither configures logging nor touches the file system.
+    """
+    if not os.path.isdir(LOG_PATH):
+        os.makedirs(LOG_PATH)
+
+    file_handler = {**LOGGING_CONFIG['handlers']['file'], 'filename': f"{LOG_PATH}izpb-analyzer_{int(datetime.now(timezone.utc).timestamp())}.log"}
+    logging.config.dictConfig({**LOGGING_CONFIG, 'handlers': {**LOGGING_CONFIG['handlers'], 'file': file_handler}})
 
 
 #### FUNC DEFINITIONS ########################
-def resolve_coref(doc:Doc) -> Doc:
+def resolve_coref(doc:Doc) -> list[str]:
     """
     Resolves (i.e., replaces) coreferences in ``doc`` with the tokens they refer to.
 
@@ -93,32 +134,68 @@ def resolve_coref(doc:Doc) -> Doc:
         doc (Doc): Pre-processed ``spacy.Doc``.
 
     Returns:
-        Doc: Coreference-resolved ``Doc``.
+        list[str]: Words of the coreference-resolved text (merged entities are split into their words again, as by the tokenizer).
     """
-    resolved_text = ''
+    coref_chains = doc._.coref_chains
+    # only tokens that are part of a mention can be resolved
+    chain_token_idx = {i for chain in coref_chains for mention in chain for i in mention.token_indexes}
+    words = []
     for token in doc:
-        repres = doc._.coref_chains.resolve(token)
-        if repres:
-            resolved_text += ' ' + ' und '.join([t.text for t in repres])
-        else:
-            resolved_text += ' ' + token.text
-    return resolved_text
+        repres = coref_chains.resolve(token) if token.i in chain_token_idx else None
+        words.extend((' und '.join([t.text for t in repres]) if repres else token.text).split())
+    return words
+
+
+def pipeline_cache_key() -> str:
+    """
+    Returns the key of the cached pipeline, derived from the versions of spaCy, ``PIPELINE_MODEL`` and coreferee and from ``PIPELINE_ADDED_PIPES``.
+
+    Returns:
+        str: Short hash identifying the assembled pipeline.
+    """
+    versions = [spacy.__version__, spacy.util.get_package_version(PIPELINE_MODEL), spacy.util.get_package_version('coreferee')]
+    key = '|'.join(map(str, versions + PIPELINE_ADDED_PIPES))
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
 
 
-def setup_spacy_pipeline() -> Language:
+def setup_spacy_pipeline(cache_path:str=PIPELINE_CACHE_PATH) -> Language:
     """
     Setup ``spacy.Language`` instance.
+    The assembled pipeline is saved to ``f'{cache_path}-{pipeline_cache_key()}'`` and loaded from there in subsequent runs.
+    It is written to a temporary directory first and then moved into place, so that an interrupted run leaves no partial cache;
+    a cache that cannot be loaded anyway is removed and rebuilt.
+
+    Args:
+        cache_path (str, optional): Directory of the cached pipeline (without key); if None the pipeline is not cached. Defaults to PIPELINE_CACHE_PATH.
 
     Returns:
         Language: Return setup ``spacy.Language`` instance.
     """
-    #sent_config = {'punct_chars': ['.', '?', '!', ';']}
-    nlp = spacy.load('de_core_news_lg')
+    if cache_path:
+        cache_path = f"{cache_path}-{pipeline_cache_key()}"
+        if os.path.isdir(cache_path):
+            try:
+                return spacy.load(cache_path)
+            except Exception as e:
+                log.warning(f"REBUILDING pipeline; cache {cache_path} unreadable: {e!r}")
+                shutil.rmtree(cache_path, ignore_errors=True)
 
-    nlp.add_pipe('merge_entities', after='ner')
-    nlp.add_pipe('coreferee', after='merge_entities')
-    nlp.add_pipe('gender_ner', after='coreferee')
-    nlp.add_pipe('gender_prn', after='gender_ner')
+    #sent_config = {'punct_chars': ['.', '?', '!', ';']}
+    nlp = spacy.load(PIPELINE_MODEL)
+
+    for name, after in PIPELINE_ADDED_PIPES:
+        nlp.add_pipe(name, after=after)
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(cache_path))
+        try:
+            nlp.to_disk(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:   # e.g., written by a concurrent run in the meantime
+            log.warning(f"NOT CACHED pipeline at {cache_path}: {e!r}")
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)   # nothing left once moved into place
     return nlp
 
 
@@ -133,10 +210,12 @@ def preprocess(input_str:str, statistics:Statistics) -> str:
     Returns:
         str: Preprocessed string.
     """
-    preprocessed_par = re.sub(r'[–]+', '-', input_str)
-    preprocessed_par = re.sub(r'\n+', '', preprocessed_par)
-    statistics.num_slashes += len(re.findall(r'/ ?[A-z]+', preprocessed_par))
-    preprocessed_par = re.sub(r' ?/ ?((?!i)|(?!-i))[A-z]+', '', preprocessed_par)
+    # the regular expressions are only run if the paragraph contains the character every match requires
+    preprocessed_par = DASH_RE.sub('-', input_str) if '–' in input_str else input_str
+    preprocessed_par = preprocessed_par.replace('\n', '')
+    if '/' in preprocessed_par:
+        preprocessed_par, num_slashes = SLASH_RE.subn('', preprocessed_par)
+        statistics.num_slashes += num_slashes
     return preprocessed_par
 
 
@@ -152,21 +231,21 @@ def log_results(statistics:Statistics, logger:Callable=log.debug):
     logger('Results')
 
     logger('\t%s', statistics.descr.num_matches_descr)
-    logger('\t%s', [v/statistics.descr.num_matches_descr['DESCR:F'] if statistics.descr.num_matches_descr['DESCR:F'] > 0 else 0 for v in statistics.glean.female_glean])
-    logger('\t%s', [v/statistics.descr.num_matches_descr['DESCR:M'] if statistics.descr.num_matches_descr['DESCR:M'] > 0 else 0 for v in statistics.glean.male_glean])
-    logger('\t%s', [v/statistics.descr.num_matches_descr['DESCR:NA'] if statistics.descr.num_matches_descr['DESCR:NA'] > 0 else 0 for v in statistics.glean.ud_glean])
+    # mean norm values per gender (0 if there are no descriptors)
+    for label, glean in (('DESCR:F', statistics.glean.female_glean), ('DESCR:M', statistics.glean.male_glean), ('DESCR:NA', statistics.glean.ud_glean)):
+        num_descr = statistics.descr.num_matches_descr[label]
+        logger('\t%s', np.divide(glean, num_descr, out=np.zeros_like(glean), where=num_descr > 0).tolist())
 
     logger('\t%s', statistics.per.num_matches_per)
     logger('\t%s', statistics.prn.num_matches_prn)
 
 
-def save_results(statistics:Statistics, stats_list:list[list[int]]):
+def save_results(statistics:Statistics):
     """
-    Saves all occurrences and counts to files.
+    Saves all occurrences to files (the counts for each article are written to the stats table during the analysis, see ``main``).
 
     Args:
-        statistics (Statistics): Occurrences and counts collected for the corpus as a whole.
-        stats_list (list[list[int]]): Occurences and counts collected for each article individually.
+        statistics (Statistics): Occurrences collected for the corpus as a whole.
     """
     log.info('='*150)
     log.info('SAVING statistics')
@@ -190,46 +269,159 @@ def save_results(statistics:Statistics, stats_list:list[list[int]]):
     for n, m in statistics.byd_mw.match_lists.items():
         write_occurences_to_file(f"{STATS_PATH}matches-{n}{VERSION_EXT}.csv", m)
 
-    with open(f"{STATS_PATH}stats_table{VERSION_EXT}.csv", mode='w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        header = ['article', 'token_num', 'num_slashes',
-                  'num_PER_F', 'num_PER_M', 'num_PER_NA', 'num_PER_AMB',
-                  'num_PRN_F', 'num_PRN_M',
-                  'num_DESCR_F', 'num_DESCR_M', 'num_DESCR_NA', 'num_NEG',
-                  'F_AROU', 'F_VAL', 'F_IMA', 'F_CONC',
-                  'M_AROU', 'M_VAL', 'M_IMA', 'M_CONC',
-                  'UD_AROU', 'UD_VAL', 'UD_IMA', 'UD_CONC',
-                  'num_noGLEAN_F', 'num_noGLEAN_M', 'num_noGLEAN_NA']
-        header.extend(list(k for k in statistics.byd_mw.num_matches.keys()))
-        writer.writerow(header)
-        writer.writerows(stats_list)
-
 
 #### RUN ANALYSIS ############################
-def analyze(nlp:Language, file_name:str, article_content:list[str], statistics:Statistics, matchers:dict[str,Matcher]=None):
+def article_statistics(corpus_stats:Statistics) -> Statistics:
+    """
+    Creates the data object for a single article; the occurrences are collected for the corpus as a whole (i.e., shared with ``corpus_stats``), the counts for the article only.
+    As the occurrence dicts are only referenced (not copied), this is cheap; a separate data object per article is needed,
+    since the next articles are already loaded and preprocessed while the paragraphs of an article are still being counted (see ``main``).
+
+    Args:
+        corpus_stats (Statistics): Data object with the occurrences collected for the corpus as a whole.
+
+    Returns:
+        Statistics: Data object for the article.
+    """
+    return Statistics(Statistics.PER(corpus_stats.per.female_per, corpus_stats.per.male_per, corpus_stats.per.amb_per, corpus_stats.per.nh_per, corpus_stats.per.ud_per), 
+                      Statistics.PRN(corpus_stats.prn.female_prn, corpus_stats.prn.male_prn), 
+                      Statistics.DESCR(corpus_stats.descr.female_descriptors, corpus_stats.descr.male_descriptors, corpus_stats.descr.ud_descriptors), 
+                      Statistics.GLEAN(),
+                      Statistics.BYD_MW(corpus_stats.byd_mw.match_lists, dict.fromkeys(corpus_stats.byd_mw.num_matches, 0)))
+
+
+def resolve_articles(nlp:Language, articles:list[str], article_stats:dict[str,Statistics], corpus_stats:Statistics, workers_started:threading.Event=None) -> Iterator[tuple[list[str]|Doc,str]]:
+    """
+    Loads the ``articles`` and resolves the coreferences in their paragraphs.
+    Paragraphs without coreferences are not changed by the resolution, so their ``Doc`` is passed on as is (instead of the text to be annotated again).
+    Creates the data object of each loaded article in ``article_stats``.
+    The next ``PREFETCH_ARTICLES`` articles are loaded in a background thread while the current one is processed.
+    As forking a process while another thread runs (and possibly holds a lock) can deadlock the child, the background thread is only started once ``workers_started`` is set, i.e., once spaCy's worker processes exist.
+
+    Args:
+        nlp (Language): Already setup spaCy NLP ``Language`` object.
+        articles (list[str]): Names of the files of the articles to be analyzed.
+        article_stats (dict[str,Statistics]): Data objects of the articles by file name.
+        corpus_stats (Statistics): Data object with the occurrences collected for the corpus as a whole.
+        workers_started (threading.Event, optional): Set once no more processes are forked (see ``annotate``); if None, articles are prefetched from the start. Defaults to None.
+
+    Yields:
+        Iterator[tuple[list[str]|Doc,str]]: Words of the coreference-resolved paragraphs (or already annotated ``Doc`` objects) with the file name of their article.
+    """
+    num_articles = len(articles)
+    executor = None
+    loading = deque()   # prefetched articles, in order
+    try:
+        for n, file_name in enumerate(articles):
+            log.info('='*150)
+            log.info(f"Loading...    Article No:{n+1:>4} / {num_articles}       {file_name}")
+
+            if executor is None and (workers_started is None or workers_started.is_set()):
+                executor = ThreadPoolExecutor(max_workers=1)
+                loading.extend(executor.submit(load_text, f"{DATA_DIR}{name}") for name in articles[n:n + PREFETCH_ARTICLES])
+            if executor:
+                raw_text = loading.popleft().result()
+                if n + PREFETCH_ARTICLES < num_articles:
+                    loading.append(executor.submit(load_text, f"{DATA_DIR}{articles[n + PREFETCH_ARTICLES]}"))
+            else:
+                raw_text = load_text(f"{DATA_DIR}{file_name}")
+            if not raw_text:
+                log.info(f"SKIPPED bibliography|imprint")
+                continue
+
+            statistics = article_stats[file_name] = article_statistics(corpus_stats)
+            preprocessed_pars = [preprocess(par, statistics) for par in raw_text]
+            for pre_anno_par in nlp.pipe(preprocessed_pars, batch_size=BATCH_SIZE, disable=COREF_DISABLED):
+                yield (resolve_coref(pre_anno_par) if pre_anno_par._.coref_chains else pre_anno_par), file_name
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def annotate(nlp:Language, resolved_pars:Iterator[tuple[list[str]|Doc,str]], workers_started:threading.Event=None) -> Iterator[tuple[Doc,str]]:
+    """
+    Annotates the coreference-resolved paragraphs (of all articles) in parallel; paragraphs that are already annotated are passed through.
+    The resolved paragraphs are passed to the pipeline as ``Doc`` objects created from their words, so that they are not tokenized again.
+    Each paragraph passed through is represented in the pipeline by an empty placeholder ``Doc``, so that it is yielded (and released) as soon as
+    the paragraphs before it are annotated, instead of being held until the next paragraph to annotate comes back.
+
+    Args:
+        nlp (Language): Already setup spaCy NLP ``Language`` object.
+        resolved_pars (Iterator[tuple[list[str]|Doc,str]]): Coreference-resolved paragraphs with the file name of their article (see ``resolve_articles``).
+        workers_started (threading.Event, optional): Set as soon as the first paragraph is annotated, i.e., once the worker processes have been started. Defaults to None.
+
+    Yields:
+        Iterator[tuple[Doc,str]]: Annotated paragraphs with the file name of their article, in the order of ``resolved_pars``.
+    """
+    passed = deque()    # paragraphs passed through (in order) whose placeholder is in the pipeline
+
+    def texts():
+        for par, file_name in resolved_pars:
+            if isinstance(par, Doc):
+                passed.append(par)
+                yield Doc(nlp.vocab), (True, file_name)
+            else:
+                yield Doc(nlp.vocab, words=par), (False, file_name)
+
+    for anno_par, (is_passed, file_name) in nlp.pipe(texts(), as_tuples=True, n_process=N_PROCESS, batch_size=BATCH_SIZE, disable=PARALLEL_DISABLED):
+        if workers_started: workers_started.set()
+        yield (passed.popleft() if is_passed else anno_par), file_name
+
+
+def analyze(nlp:Language, file_name:str, anno_par:Doc, statistics:Statistics, matchers:dict[str,re.Pattern]=None):
     """
-    Runs analysis of a single article (paragraph by paragraph).
+    Runs analysis of a single (coreference-resolved and annotated) paragraph of an article.
 
     Args:
         nlp (Language): Already setup spaCy NLP ``Language`` object.
         file_name (str): Name of the file of the article to be analyzed.
-        article_content (list[str]): Text content of the article to be analyzed
+        anno_par (Doc): Paragraph to be analyzed, annotated by all pipes but ``SEQUENTIAL_PIPES``.
         statistics (Statistics): Data object to directly save occurrences and counts to.
-        matchers (dict[str,Matcher], optional): Dictionary of named ``spacy.matcher.Matcher``s that shall be used analysis as well. Defaults to None.
+        matchers (dict[str,re.Pattern], optional): Regular expressions (see ``byd_mw.setup``) that shall be used in the analysis as well. Defaults to None.
     """
-    for par in article_content:
-        pre_anno_par = nlp(preprocess(par, statistics))
-        resolved_par = resolve_coref(pre_anno_par)
-        anno_par = nlp(resolved_par)
-        statistics.token_num += len(anno_par)
+    # 'gender_ner' (which queries Wikidata) and 'gender_prn' are applied in this process
+    for name in SEQUENTIAL_PIPES:
+        anno_par = nlp.get_pipe(name)(anno_par)
+    statistics.token_num += len(anno_par)
 
-        if matchers: byd_mw.match(file_name, matchers, anno_par, log, statistics)
+    if matchers: byd_mw.match(file_name, matchers, anno_par, log, statistics)
+
+    fa_per.count_per(anno_par, statistics, log)
+    fa_prn.count_prn(anno_par, statistics, log)
+    descr_pars.parse_descriptors(anno_par, statistics, log)
+
+
+def article_info(file_name:str, statistics:Statistics) -> list:
+    """
+    Summarizes the counts of an analyzed article as a row of the stats table (see ``save_results``).
+
+    Args:
+        file_name (str): Name of the file of the analyzed article.
+        statistics (Statistics): Data object of the analyzed article.
+
+    Returns:
+        list: Row of the stats table.
+    """
+    info = [
+        file_name[:-5], statistics.token_num, statistics.num_slashes,
+        statistics.per.num_matches_per[PER_GENDER_MAPPING['PER:F']], statistics.per.num_matches_per[PER_GENDER_MAPPING['PER:M']], statistics.per.num_matches_per['PER:NA'], statistics.per.num_matches_per['PER:AMB'],
+        statistics.prn.num_matches_prn['PRN:F'], statistics.prn.num_matches_prn['PRN:M'],
+        statistics.descr.num_matches_descr['DESCR:F'], statistics.descr.num_matches_descr['DESCR:M'], statistics.descr.num_matches_descr['DESCR:NA'], statistics.descr.num_neg,
+        *statistics.glean.female_glean.tolist(),
+        *statistics.glean.male_glean.tolist(),
+        *statistics.glean.ud_glean.tolist(),
+        statistics.glean.glean_not_found['DESCR:F'], statistics.glean.glean_not_found['DESCR:M'], statistics.glean.glean_not_found['DESCR:NA']                   
+    ]
+    info.extend(statistics.byd_mw.num_matches.values())
+    return info
 
-        fa_per.count_per(anno_par, statistics, log)
-        fa_prn.count_prn(anno_par, statistics, log)
-        descr_pars.parse_descriptors(anno_par, statistics, log)
 
 def main():
+    global descr_pars
+    setup_logging()
+    log.info('IMPORT glean norm values')
+    import analysis.descr_pars as descr_pars
+
     log.info('SETUP spaCy Pipeline')
     nlp = setup_spacy_pipeline()
     log.info('+  setup prn pipe')
@@ -240,11 +432,11 @@ def main():
     matchers = byd_mw.setup(nlp, log)
 
     log.info(f"START ANALYSIS ({VERSION_EXT})")
-    prev_stats = Statistics(Statistics.PER({}, {}, {}, {}, {}),
-                            Statistics.PRN({}, {}), 
-                            Statistics.DESCR({}, {}, {}), 
-                            Statistics.GLEAN(),
-                            Statistics.BYD_MW({}, {name:0 for name in matchers.keys()}))
+    corpus_stats = Statistics(Statistics.PER(),
+                              Statistics.PRN(), 
+                              Statistics.DESCR(defaultdict(int), defaultdict(int), defaultdict(int)), 
+                              Statistics.GLEAN(),
+                              Statistics.BYD_MW({}, {name:0 for name in matchers}))
 
     articles = os.listdir(DATA_DIR)
     if log.level == logging.DEBUG:
@@ -253,39 +445,32 @@ def main():
         else:
             articles = articles[:50]
 
-    stats_list = []
-    num_articles = len(articles)
-    for n, file_name in enumerate(articles):
-        log.info('='*150)
-        log.info(f"Loading...    Article No:{n+1:>4} / {num_articles}       {file_name}")
-
-        if raw_text := load_text(f"{DATA_DIR}{file_name}"):
-            statistics = Statistics(Statistics.PER(prev_stats.per.female_per, prev_stats.per.male_per, prev_stats.per.amb_per, prev_stats.per.nh_per, prev_stats.per.ud_per), 
-                                    Statistics.PRN(prev_stats.prn.female_prn, prev_stats.prn.male_prn), 
-                                    Statistics.DESCR(prev_stats.descr.female_descriptors, prev_stats.descr.male_descriptors, prev_stats.descr.ud_descriptors), 
-                                    Statistics.GLEAN(),
-                                    Statistics.BYD_MW(prev_stats.byd_mw.match_lists, {name:0 for name in matchers.keys()}))
-            analyze(nlp, file_name, raw_text, statistics, matchers)
-            info = [
-                file_name[:-5], statistics.token_num, statistics.num_slashes,
-                statistics.per.num_matches_per[PER_GENDER_MAPPING['PER:F']], statistics.per.num_matches_per[PER_GENDER_MAPPING['PER:M']], statistics.per.num_matches_per['PER:NA'], statistics.per.num_matches_per['PER:AMB'],
-                statistics.prn.num_matches_prn['PRN:F'], statistics.prn.num_matches_prn['PRN:M'],
-                statistics.descr.num_matches_descr['DESCR:F'], statistics.descr.num_matches_descr['DESCR:M'], statistics.descr.num_matches_descr['DESCR:NA'], statistics.descr.num_neg, #sum(statistics.descr.female_descriptors.values())-sum(prev_stats.descr.female_descriptors.values()), sum(statistics.descr.male_descriptors.values()), sum(statistics.descr.ud_descriptors.values()), statistics.descr.num_neg,
-                statistics.glean.female_glean[0], statistics.glean.female_glean[1], statistics.glean.female_glean[2], statistics.glean.female_glean[3],
-                statistics.glean.male_glean[0], statistics.glean.male_glean[1], statistics.glean.male_glean[2],  statistics.glean.male_glean[3],       
-                statistics.glean.ud_glean[0], statistics.glean.ud_glean[1], statistics.glean.ud_glean[2], statistics.glean.ud_glean[3],
-                statistics.glean.glean_not_found['DESCR:F'], statistics.glean.glean_not_found['DESCR:M'], statistics.glean.glean_not_found['DESCR:NA']                   
-            ]
-            info.extend((v for v in statistics.byd_mw.num_matches.values()))
-            stats_list.append(info)
-            prev_stats = statistics
-        else:
-            log.info(f"SKIPPED bibliography|imprint")
-        
-        log_results(prev_stats)
-
-    save_results(prev_stats, stats_list)
+    if not os.path.isdir(STATS_PATH):
+        os.makedirs(STATS_PATH)
 
+    # the resolved paragraphs of all articles are annotated in parallel (across article boundaries);
+    # the annotated paragraphs arrive in order, so an article is complete (and written to the stats table) as soon as the next one starts
+    with open(f"{STATS_PATH}stats_table{VERSION_EXT}.csv", mode='w', encoding='utf-8', newline='') as stats_table:
+        writer = csv.writer(stats_table)
+        writer.writerow(STATS_TABLE_HEADER + list(matchers))
+
+        article_stats = {}
+        # with several processes, spaCy forks its workers only after reading the first paragraphs (no other thread may run by then)
+        workers_started = threading.Event() if N_PROCESS > 1 else None
+        resolved_pars = resolve_articles(nlp, articles, article_stats, corpus_stats, workers_started)
+        current = None
+        for anno_par, file_name in annotate(nlp, resolved_pars, workers_started):
+            if file_name != current:
+                if current:
+                    writer.writerow(article_info(current, article_stats[current]))
+                    log_results(article_stats.pop(current))
+                current = file_name
+            analyze(nlp, file_name, anno_par, article_stats[file_name], matchers)
+        if current:
+            writer.writerow(article_info(current, article_stats[current]))
+            log_results(article_stats.pop(current))
+
+    save_results(corpus_stats)
 
 if __name__ == '__main__':
     main()
@@ -2,28 +2,46 @@
 # misc
 import os
 import sys
+import time
 import logging
 import logging.config
-from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple, fields
 from datetime import datetime, timezone
+from contextlib import ExitStack
 import uuid
 import csv
 import json
 import re
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 # webscraping libraries
 import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag, NavigableString, CData
+
+# optional: on-disk cache of retrieved pages for reruns (``pip install requests-cache``)
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# optional: faster (de)serialization of the listing and article JSON (``pip install orjson``)
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # spaCy (nlp tool)
 import spacy
 from spacy.language import Language
+from spacy.tokens import Doc
 
 # own modules
 from analysis.helper import flatten_article
-from analysis.fa_per import obtain_gender
+import analysis.fa_per as fa_per
 import analysis.fa_prn as fa_prn
 
 
@@ -32,6 +50,63 @@ import analysis.fa_prn as fa_prn
 BASE_URL = 'https://www.bpb.de'
 list_url = lambda p: BASE_URL + '/bpbapi/filter/generic?page=' + str(p) + '&sort[direction]=descending&language=de&query[field_filter_thema]=all&query[field_date_content]=all&query[d]=1&payload[nid]=122&payload[type]=default'
 HEADER = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36 Edg/111.0.1661.41'}
+HTTP_CACHE_PATH = 'data/cache/http'
+HTTP_CACHE_EXPIRY = 7 * 24 * 60 * 60 # in seconds; expired pages are revalidated (ETag / Last-Modified) if possible
+if requests_cache:
+    SESSION = requests_cache.CachedSession(HTTP_CACHE_PATH, backend='sqlite', expire_after=HTTP_CACHE_EXPIRY, allowable_methods=('GET',))
+else:
+    SESSION = requests.Session()
+MAX_CONCURRENT_REQUESTS = 8 # pages fetched (and parsed) in parallel
+SESSION.headers.update(HEADER)
+SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS))
+MAX_ATTEMPTS = 5            # attempts per page if the server fails
+MAX_BACKOFF = 60            # maximum waiting time (in seconds) between attempts
+# only the parts of an article page that are used are parsed; volume pages are parsed whole, as their sections are read from
+# containers (the ancestors of the section labels) that a strainer cannot select
+ARTICLE_STRAINER = SoupStrainer(class_=['text-content', 'opening-header__title', 'opening-header__author', 'popup--author'])
+GECKODRIVER_PATH = r'C:\Program Files (x86)\geckodriver-v0.33.0-win64\geckodriver.exe'
+POPUP_TIMEOUT = 5           # time (in seconds) to wait for the content of an author popup
+# opens, reads and closes the author popups one after another within a single (asynchronous) call to the browser; returns ``[[name, info], ...]``.
+# Before each click the previous dialog is closed, and its content is only read once it differs from the previous author's (or names the author),
+# so that a stale dialog is not attributed to the next author; info is null if no content appeared within POPUP_TIMEOUT.
+AUTHOR_POPUPS_JS = '''
+var done = arguments[arguments.length - 1];
+var timeout = arguments[0] * 1000;
+var elems = Array.from(document.getElementsByClassName('popup--author'));
+var popups = [];
+function closeDialog() {
+    var close = document.getElementsByClassName('popup-dialog__close')[0];
+    if (close) close.click();
+}
+function read(i, previous) {
+    if (i === elems.length) { closeDialog(); return done(popups); }
+    closeDialog();
+    var name = elems[i].innerText.trim().split('\\n')[0];
+    elems[i].click();
+    var started = Date.now();
+    (function poll() {
+        var content = document.getElementsByClassName('popup-dialog__content')[0];
+        var info = content ? content.innerText.trim() : '';
+        if (info && (info !== previous || info.indexOf(name) !== -1)) {
+            popups.push([name, info]);
+            return read(i + 1, info);
+        }
+        if (Date.now() - started >= timeout) {
+            popups.push([name, null]);
+            return read(i + 1, previous);
+        }
+        setTimeout(poll, 50);
+    })();
+}
+read(0, null);
+'''
+
+# article structure
+HEADING_RE = re.compile(r'^h[1-6]$')
+PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n\s*\n?')
+TITLE_BREAK_RE = re.compile(r'\s*\n\s*')
+NOTE_RE = re.compile(r'Hinweis.:')
+VOLUME_LABEL_RE = re.compile(r'^(Inhaltsbeschreibung|Produktinformation)\Z')
 
 # data storage
 DATA_PATH = 'data/'
@@ -41,6 +116,11 @@ DATA_PATH_ARTICLES = f"{DATA_PATH}articles/"
 PER_GENDER_MAPPING = {'männlich':'M', 'weiblich':'F', 'NA':'NA', 'AMB':'AMB'}
 PER_GENDER_DEFAULT = 'O' 
 PRN_LIST_PATH = 'analysis/prn_list_v21_adjusted.csv'
+PPN_TAGS = frozenset({'PPER', 'PPOSAT'})  # personal and possessive pronouns
+PPN_LEMMAS_F = frozenset({'sie', 'ihr', 'ihre'})
+PPN_LEMMAS_M = frozenset({'er', 'sein', 'seine', 'ihn', 'ihm'})
+AUTHOR_BATCH_SIZE = 64      # author infos processed per batch by spaCy
+UNUSED_PIPES = ['parser', 'ner']
 
 
 #### LOGGING #################################
@@ -108,9 +188,22 @@ class Volume:
     pages:int = None
     published:datetime = None
 
-def get_content(elem:Tag, h_level:int, heading:bool) -> list[dict]:
+def paragraph_text(elem:Tag) -> str:
     """
-    Recursively retrieves and structures an article's content in a json-like format according to the respective HTML-tags (``p`` and ``h1``-``h6``).
+    Returns the text of the paragraph ``elem`` with line breaks (``br``) as newlines, without modifying the parsed page.
+
+    Args:
+        elem (Tag): Paragraph parsed with ``bs4``.
+
+    Returns:
+        str: Text of ``elem`` (i.e., ``elem.text``) with a newline for each line break.
+    """
+    return ''.join('\n' if d.name == 'br' else d for d in elem.descendants if d.name == 'br' or type(d) in (NavigableString, CData))
+
+
+def get_content(elem:Tag, h_level:int) -> list[dict]:
+    """
+    Retrieves and structures an article's content in a json-like format according to the respective HTML-tags (``p`` and ``h1``-``h6``).
     Example Structure (only the value for 'title' will be returned, the title has to be added manually: ``{title: article_content}``)::
     
         {'title': [
@@ -118,92 +211,194 @@ def get_content(elem:Tag, h_level:int, heading:bool) -> list[dict]:
             {'h3': [
                 'p', 'p',
                 {'h4': ['p', 'p', 'p']}, 
-                {'h4': [
-                    {'h6': ['p']}  # there might be a jump in headings
-                ]}
+                {'h4': ['p']}
             ]}
         ]}
 
+    ``elem`` and its following siblings are walked once, keeping a stack of the currently open sections.
+    Paragraphs are only kept before the first subheading of a section; headings that skip a level (e.g., ``h6`` directly below ``h4``) are dropped together with their paragraphs.
+
     Args:
-        elem (Tag): HTML content parsed with ``bs4``.
-        h_level (int): Current heading level if elem is a paragraph, previous heading level is elem is a heading itself.
-        heading (bool): Helper variable to mitigate duplicate processing of the same paragraph; search for headings on the same level and avoid multiple recursive calls.
+        elem (Tag): First paragraph or heading of the article's content, parsed with ``bs4``.
+        h_level (int): Heading level of the article's top-level sections.
 
     Raises:
         Exception: Raised if elem is not in the proper HTML (bs4.Tag) format.
 
     Returns:
-        list[dict]: Json-like representation of the article's content (or parts of it during recursion).
+        list[dict]: Json-like representation of the article's content.
     """
+    content = []
     if elem is None:
-        return [] # Recursion anchor: no more content existent
+        return content
     
-    # elem is a paragraph
-    elif 'p' in elem.name:
-        next_elem = elem.find_next_sibling([re.compile('^h[1-6]$'), 'p'], slot="", recursive=False)
-        if heading:
-            return get_content(next_elem, h_level, True)
+    # open sections: [heading level of their subsections, content, still before the first subheading]
+    stack = [[h_level, content, True]]
+    for elem in [elem, *elem.find_next_siblings([HEADING_RE, 'p'], slot="", recursive=False)]:
+        # elem is a paragraph
+        if 'p' in elem.name:
+            if not stack[-1][2]:
+                continue
+
+            stack[-1][1].extend(s.strip() for s in PARAGRAPH_SPLIT_RE.split(paragraph_text(elem).strip()))
         
-        succ = get_content(next_elem, h_level, False)
+        # elem is a heading
+        elif 'h' in elem.name:
+            level = int(elem.name[-1])
+            while level < stack[-1][0]: # New heading closes the current section
+                stack.pop()
+                if not stack:
+                    return content
+            stack[-1][2] = False
+            if level == stack[-1][0]: # New heading opens a subsection of the current section (deeper headings are skipped)
+                section = []
+                stack[-1][1].append({elem.text.strip(): section})
+                stack.append([level + 1, section, True])
+        
+        # elem is not in the proper format (bs4.Tag)
+        else:
+            raise Exception('FormatException: The HTML article is not in the proper format.')
+    return content
 
-        # cleaning
-        for br in elem.find_all('br'):
-            br.replace_with('\n' + br.text.strip())
-        res = [s.strip() for s in re.split('\n\s*\n\s*\n?', elem.text.strip())] 
 
-        if isinstance(succ, list):
-            res.extend(succ)
-        else:
-            res.append(succ)
-        return res  
-    
-    # elem is a heading
-    elif 'h' in elem.name:
-        next_elem = elem.find_next_sibling([re.compile('^h[1-6]$'), 'p'], slot="", recursive=False)
-        if h_level == int(elem.name[-1]): # New heading is on same level as the previous heading
-            h_level = int(elem.name[-1])
-            res = [{elem.text.strip(): get_content(next_elem, h_level+1, False)}]
-            x = get_content(next_elem, h_level, True)
-            res.extend(x) 
-            return res
-        elif h_level < int(elem.name[-1]): # New heading is a subheading of the previous heading
-            return get_content(next_elem, h_level, True)
-        else: # New heading is not on the same level as the previous one and netiher a subheading of it
-            return [] # Recursion anchor: go upward in hierarchy
-    
-    # elem is not in the proper format (bs4.Tag)
+def retry_delay(error:requests.RequestException, attempt:int) -> float:
+    """
+    Returns how long to wait before the next attempt of a failed request.
+
+    Args:
+        error (requests.RequestException): Error raised by the failed attempt.
+        attempt (int): Number of the failed attempt (starting at 0).
+
+    Returns:
+        float: Waiting time in seconds: as requested by the ``Retry-After`` header if present, ``2 ** attempt`` (at most ``MAX_BACKOFF``) otherwise.
+    """
+    retry_after = error.response.headers.get('Retry-After') if error.response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after)
+    return min(MAX_BACKOFF, 2 ** attempt)
+
+
+def fetch(url:str) -> requests.Response:
+    """
+    Retrieves ``url`` via the shared ``SESSION`` (i.e., over kept-alive connections).
+    Retries with exponential backoff if the server fails.
+
+    Args:
+        url (str): URL to retrieve.
+
+    Returns:
+        requests.Response: Successful response.
+
+    Raises:
+        requests.RequestException: If all ``MAX_ATTEMPTS`` attempts failed.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            resp = SESSION.get(url, timeout=30)
+            resp.raise_for_status()
+            break
+        except requests.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            if attempt == MAX_ATTEMPTS - 1 or (status and 400 <= status < 500 and status != 429):
+                raise
+            time.sleep(retry_delay(e, attempt))
+    return resp
+
+
+def get_listing(page:int) -> dict:
+    """
+    Retrieves a page of the API listing the volumes (see ``fetch``).
+
+    Args:
+        page (int): Number of the page (starting at 0).
+
+    Returns:
+        dict: Decoded JSON response.
+    """
+    resp = fetch(list_url(page))
+    return orjson.loads(resp.content) if orjson else resp.json()
+
+
+def get_page(url:str, parse_only:SoupStrainer=None) -> BeautifulSoup:
+    """
+    Retrieves the HTML page at ``url`` (see ``fetch``) and parses it with the C-based ``lxml`` parser.
+    The encoding is passed on if the server declares one, which spares ``bs4`` from sniffing it.
+
+    Args:
+        url (str): URL of the page to retrieve.
+        parse_only (SoupStrainer, optional): Restricts parsing to the matching elements (and their descendants). Defaults to None.
+
+    Returns:
+        BeautifulSoup: Parsed HTML page.
+    """
+    resp = fetch(url)
+    encoding = resp.encoding if 'charset' in resp.headers.get('Content-Type', '') else None
+    return BeautifulSoup(resp.content, 'lxml', from_encoding=encoding, parse_only=parse_only)
+
+
+def save_article(article:dict, article_uuid:uuid.UUID):
+    """
+    Saves the json-like ``article`` (see ``get_content``) to ``DATA_PATH_ARTICLES``.
+
+    Args:
+        article (dict): Article's title and content in the form of ``{title: article_content}``.
+        article_uuid (uuid.UUID): UUID of the article used as file name.
+    """
+    if orjson:
+        with open(f"{DATA_PATH_ARTICLES}{article_uuid}.json", mode='wb') as file:
+            file.write(orjson.dumps(article, option=orjson.OPT_INDENT_2))
     else:
-        raise Exception('FormatException: The HTML article is not in the proper format.')
+        with open(f"{DATA_PATH_ARTICLES}{article_uuid}.json", mode='w', encoding='utf-8', newline='') as file:
+            json.dump(article, file, indent=2, ensure_ascii=False)
+    log.info(f"\t\t\tSAVE:\t{article_uuid}")
 
 
-def infer_gender(nlp:Language, name:str, info:str) -> tuple[int,int,int]:
+def get_author_popups(apage:BeautifulSoup) -> list[tuple[str,str]]:
     """
-    Collects gender information based on pronouns and people-related nouns in info as well as Wikidata entries for ``name``.
+    Retrieves the name and information text of each author from the author popups (``popup--author``) embedded in the article page ``apage``, without rendering them in a browser.
 
     Args:
-        nlp (Language): Already setup spaCy NLP ``Language`` object.
+        apage (BeautifulSoup): Parsed article page.
+
+    Returns:
+        list[tuple[str,str]]: Name and raw information text of each author; empty if the popups' content is not part of the page's markup.
+    """
+    popups = []
+    for elem in apage.find_all(class_='popup--author'):
+        content = elem.find(class_='popup-dialog__content')
+        if content is None:
+            return []
+        name = elem.get_text('\n', strip=True).split('\n')[0]
+        popups.append((name, content.get_text('\n', strip=True)))
+    return popups
+
+
+def infer_gender(doc:Doc, name:str) -> tuple[int,int,int]:
+    """
+    Collects gender information based on pronouns and people-related nouns in the information text ``doc`` as well as Wikidata entries for ``name``.
+
+    Args:
+        doc (Doc): Information text about that person / author (``name``), already processed by the spaCy pipeline.
         name (str): Person's / Author's name.
-        info (str): Information text about that person / author (``name``).
 
     Returns:
         tuple[int,int,int]: 3-tuple with a gender descriptor ('AIG:M'/'AIG:F'/'AIG:AMB/'AIG:NA') for each method (pronouns, people-related nouns, Wikidata).
     """
-    doc = nlp(info)
-
     gender_prn = 'AIG:NA'
     gender_ppn = 'AIG:NA'
     gender_ppn_set = set()
 
     # --- wikidata ----------------------
-    gender_wikidata = 'AIG:' + PER_GENDER_MAPPING.get(obtain_gender(name)[4:], PER_GENDER_DEFAULT)
+    gender_wikidata = 'AIG:' + PER_GENDER_MAPPING.get(fa_per.obtain_gender_or_na(name, log)[4:], PER_GENDER_DEFAULT)
     num_matches_prn = fa_prn.count_prn(doc)
 
     # --- pronouns -----------------------
     for token in doc:
-        if token.tag_ in ['PPER', 'PPOSAT']:
-            if token.lemma_.lower()  in ['sie', 'ihr', 'ihre']:
+        if token.tag_ in PPN_TAGS:
+            lemma = token.lemma_.lower()
+            if lemma in PPN_LEMMAS_F:
                 gender_ppn_set.add('AIG:F')
-            elif token.lemma_.lower() in ['er', 'sein', 'seine', 'ihn', 'ihm']:
+            elif lemma in PPN_LEMMAS_M:
                 gender_ppn_set.add('AIG:M')
 
     if len(gender_ppn_set) == 1:
@@ -238,19 +433,19 @@ def infer_gender(nlp:Language, name:str, info:str) -> tuple[int,int,int]:
 def run():
     # --- setup -------------------------
     log.info(f"SETUP")
-    corpus = []
 
     api_page = 0
-    response = json.loads(requests.get(list_url(api_page), HEADER).content)
+    response = get_listing(api_page)
 
-    browser = webdriver.Firefox(executable_path=r'C:\Program Files (x86)\geckodriver-v0.33.0-win64\geckodriver.exe')
+    browser = None  # only started if author popups have to be rendered
 
     authors = set()
-    articles = []
 
-    nlp = spacy.load('de_core_news_lg')
+    # tags, POS and lemmas suffice for gender inference
+    nlp = spacy.load('de_core_news_lg', exclude=UNUSED_PIPES)
     nlp.add_pipe('gender_prn')
     fa_prn.setup(PRN_LIST_PATH, log)  
+    fa_per.setup(log)   # persisted Wikidata gender cache, shared with the analysis
 
     # --- page loop ---------------------
     # iterate pages listing the volumes
@@ -259,189 +454,229 @@ def run():
     while response['offset'] < response['count']:
         teasers.extend(response['teaser'])
         api_page += 1
-        response = json.loads(requests.get(list_url(api_page), HEADER).content)
+        response = get_listing(api_page)
+
+    # a volume listed more than once (e.g., if the listing changed while paging through it) is only scraped once
+    unique_teasers = {}
+    for teaser in teasers:
+        unique_teasers.setdefault(teaser['meta']['id'], teaser)
+    if len(unique_teasers) < len(teasers):
+        log.info(f"-> skipped {len(teasers) - len(unique_teasers)} duplicate listings.")
+    teasers = list(unique_teasers.values())
 
     if log.level == logging.DEBUG:
         teasers = teasers[:5]
-    volume_ids = [teaser['meta']['id'] for teaser in teasers]
-    num_volumes = len(volume_ids)
-    log.info(f"-> {len(set(volume_ids))} volumes found.")
-
-    # --- volume loop -------------------
-    # iterate through the volumes listed on each page
-    for i, teaser in enumerate(teasers):
-        # collect volume information
-        log.info('='*150)
-        log.info(f"Loading {i+1:>2} / {num_volumes:>2}\t{teaser['teaser']['title']}")
-        info, meta, ext = teaser['teaser'], teaser['meta'], teaser['extension']
+    num_volumes = len(teasers)
+    log.info(f"-> {num_volumes} volumes found.")
+
+    # files, threads and the browser are released even if the crawl fails
+    with ExitStack() as cleanup:
+        # volumes and articles are written as soon as they are retrieved (line-buffered, i.e., flushed per row)
+        volumes_file = cleanup.enter_context(open(f"{DATA_PATH}izpb-corpus_volumes.csv", mode='w', encoding='utf-8', newline='', buffering=1))
+        volumes_writer = csv.writer(volumes_file)
+        volumes_writer.writerow([field.name for field in fields(Volume)])
+        articles_file = cleanup.enter_context(open(f"{DATA_PATH}izpb-corpus_articles.csv", mode='w', encoding='utf-8', newline='', buffering=1))
+        articles_writer = csv.writer(articles_file)
+        articles_writer.writerow(['uuid', 'title', 'article_length', 'author_uuids', 'volume_uuid', 'retrieval_date_unix'])
+
+        # fetch pages in the background; results are consumed in order
+        executor = cleanup.enter_context(ThreadPoolExecutor(MAX_CONCURRENT_REQUESTS))
+        cleanup.callback(executor.shutdown, cancel_futures=True)    # before its own exit: pending fetches are not needed anymore
+        saver = cleanup.enter_context(ThreadPoolExecutor(1))         # waits for the pending saves
+        cleanup.callback(lambda: browser.quit() if browser else None)
+        saves = []
+        # volume pages are fetched at most MAX_CONCURRENT_REQUESTS ahead (and dropped once processed),
+        # so the parsed pages are not all kept in memory and the article pages are not queued behind all remaining volume pages
+        vurls = iter([BASE_URL + teaser['teaser']['link']['url'] for teaser in teasers])
+        vpages = deque(executor.submit(get_page, vurl) for vurl in islice(vurls, MAX_CONCURRENT_REQUESTS))
+
+        # --- volume loop -------------------
+        # iterate through the volumes listed on each page
+        for i, teaser in enumerate(teasers):
+            # collect volume information
+            log.info('='*150)
+            log.info(f"Loading {i+1:>2} / {num_volumes:>2}\t{teaser['teaser']['title']}")
+            info, meta, ext = teaser['teaser'], teaser['meta'], teaser['extension']
+            volume_url = BASE_URL + info['link']['url']
         
-        v = Volume(
-            title = info['title'],
-            id = meta['id'],
-            uuid = uuid.uuid3(uuid.NAMESPACE_URL, BASE_URL + info['link']['url']),
-            url = info['link']['url'],
-            authors = [name['name'] for name in ext['authors']],
-            abstract_short = info['text'],
-            series = ext['overline'],
-            language = meta['language'],
-            created = datetime.fromtimestamp(meta['creationDate']),
-            modified = datetime.fromtimestamp(meta['modificationDate']),
-            price = ext['price'],
-            availability = {key: key in ext['availability'] for key in ['online', 'pdf']}
-        )
+            v = Volume(
+                title = info['title'],
+                id = meta['id'],
+                uuid = uuid.uuid3(uuid.NAMESPACE_URL, volume_url),
+                url = info['link']['url'],
+                authors = [name['name'] for name in ext['authors']],
+                abstract_short = info['text'],
+                series = ext['overline'],
+                language = meta['language'],
+                created = datetime.fromtimestamp(meta['creationDate']),
+                modified = datetime.fromtimestamp(meta['modificationDate']),
+                price = ext['price'],
+                availability = {key: key in ext['availability'] for key in ['online', 'pdf']}
+            )
         
-        log.info(f"\t\t\t\t{BASE_URL + v.url}")
-        vpage = BeautifulSoup(requests.get(BASE_URL + v.url, HEADER).content, features='html.parser')
-        v.abstract_long = [p.text.strip() for p in vpage.find(text='Inhaltsbeschreibung').parent.parent.parent.find_all('p')]
-
-        tb = vpage.find(text='Produktinformation').parent.parent.parent
-        with suppress(AttributeError): v.note = tb.find('th', text=re.compile('Hinweis.:')).parent.find('td').text.strip()
-        with suppress(AttributeError): v.place = tb.find('th', text='Erscheinungsort:').parent.find('td').text.strip()
-        with suppress(AttributeError): v.vol = tb.find('th', text='Ausgabe:').parent.find('td').text.strip()
-        with suppress(AttributeError): v.pages = int(tb.find('th', text='Seiten:').parent.find('td').text.strip())
-        with suppress(AttributeError): v.published = datetime.strptime(tb.find('th', text='Erscheinungsdatum:').parent.find('td').text.strip(), '%d.%m.%Y')
-
-        corpus.append(v)
-
-        if not v.availability['online']:
-            log.warning(f"skipped {v.title}; not available online")
-            continue
-
-        # --- article loop ------------------
-        alinks = vpage.find_all('a', class_='content-index__link', href=True)
-        if log.level == logging.DEBUG:
-            alinks = alinks[:2]
-        for link in alinks:
-            # collect the article's content
-            url = link['href']
-            log.info(f"\t\t\tOPEN:\t{url}")
-            apage = BeautifulSoup(requests.get(BASE_URL + url, HEADER).content, features='html.parser')
-            title = re.sub('\s*\n\s*', ' /// ', apage.find('h2', class_='opening-header__title').text.strip())            
-
-            for empty_elem in apage.find_all([re.compile('^h[1-6]$'), 'div', 'p']):
-                if len(empty_elem.get_text(strip=True)) == 0:
-                    empty_elem.extract()
-            content = apage.find('div', class_='text-content')
-
-            try:
-                first_heading = content.find(re.compile('^h[1-6]$'))
-                atext = get_content(content.find([re.compile('^h[1-6]$'), 'p'], slot="", recursive=False), int(first_heading.name[-1]) if first_heading else 3, False)
-            except Exception as e:
-                log.warning(f"No text content could be retieved: {e}")
-                atext = []
-            
-            # collect author information and infer gender
-            author = []
-            author_info = []
-            author_inferred_gender_wd = []
-            author_inferred_gender_ppn = []
-            author_inferred_gender_prn = []
-
-            try:
-                apage.find('span', class_='opening-header__author').text
+            log.info(f"\t\t\t\t{volume_url}")
+            vpage = vpages.popleft().result()
+            if vurl := next(vurls, None):
+                vpages.append(executor.submit(get_page, vurl))
+            # both section labels in one pass over the page's strings (first occurrence each)
+            labels = {}
+            for label in vpage.find_all(string=VOLUME_LABEL_RE):
+                labels.setdefault(str(label), label)
+            v.abstract_long = [p.text.strip() for p in labels['Inhaltsbeschreibung'].parent.parent.parent.find_all('p')]
+
+            tb = labels['Produktinformation'].parent.parent.parent
+            product_info = {}   # row label -> value; first row per label
+            for th in tb.find_all('th'):
+                if td := th.parent.find('td'):
+                    product_info.setdefault(th.text.strip(), td.text.strip())
+            v.note = next((value for label, value in product_info.items() if NOTE_RE.search(label)), None)
+            v.place = product_info.get('Erscheinungsort:')
+            v.vol = product_info.get('Ausgabe:')
+            if 'Seiten:' in product_info: v.pages = int(product_info['Seiten:'])
+            if 'Erscheinungsdatum:' in product_info: v.published = datetime.strptime(product_info['Erscheinungsdatum:'], '%d.%m.%Y')
+
+            volumes_writer.writerow(astuple(v))
+
+            if not v.availability['online']:
+                log.warning(f"skipped {v.title}; not available online")
+                continue
+
+            # --- article loop ------------------
+            alinks = list({link['href']: link for link in vpage.find_all('a', class_='content-index__link', href=True)}.values()) # each article once
+            if log.level == logging.DEBUG:
+                alinks = alinks[:2]
+            apages = [executor.submit(get_page, BASE_URL + link['href'], ARTICLE_STRAINER) for link in alinks]
+            for link, apage in zip(alinks, apages):
+                # collect the article's content
+                url = link['href']
+                log.info(f"\t\t\tOPEN:\t{url}")
+                apage = apage.result()
+                title = TITLE_BREAK_RE.sub(' /// ', apage.find('h2', class_='opening-header__title').text.strip())            
+
+                for empty_elem in apage.find_all([HEADING_RE, 'div', 'p']):
+                    if len(empty_elem.get_text(strip=True)) == 0:
+                        empty_elem.extract()
+                content = apage.find('div', class_='text-content')
 
                 try:
-                    browser.get(BASE_URL + url)
-                    for elem in browser.find_elements_by_class_name('popup--author'):
-                        elem.click()
-                        author.append(elem.text.strip().split('\n')[0])
-                        popup = browser.find_element_by_class_name('popup-dialog__content')
-                        info = re.sub('\n+', ' ', popup.text.strip())
-                        author_info.append(re.sub('\xad', '', info))
-                        wd, ppn, prn = infer_gender(nlp, author[-1], author_info[-1])
-                        author_inferred_gender_wd.append(wd)
-                        author_inferred_gender_ppn.append(ppn)
-                        author_inferred_gender_prn.append(prn)
-                        browser.find_element_by_class_name('popup-dialog__close').click()
-                        # log.info(f"\t\t\tAUTHORS: {author}")
-                    if author == []:
-                        raise Exception('[[own]]')
+                    first_heading = content.find(HEADING_RE)
+                    atext = get_content(content.find([HEADING_RE, 'p'], slot="", recursive=False), int(first_heading.name[-1]) if first_heading else 3)
                 except Exception as e:
+                    log.warning(f"No text content could be retieved: {e}")
+                    atext = []
+            
+                # collect author information and infer gender
+                author = []
+                author_info = []
+                author_inferred_gender_wd = []
+                author_inferred_gender_ppn = []
+                author_inferred_gender_prn = []
+
+                try:
+                    apage.find('span', class_='opening-header__author').text
+
                     try:
-                        ats = apage.find('span', class_='opening-header__author').text.split('/')
-                        author.extend([n.strip() for n in ats])
-                        author_info.extend(['' for _ in ats])
-                        empty = ['' for _ in ats]
-                        author_inferred_gender_wd.extend(empty)
-                        author_inferred_gender_ppn.extend(empty)
-                        author_inferred_gender_prn.extend(empty)
-                        log.info(f"\t\t\t\tAUTHORS; no info: {author}")
+                        popups = get_author_popups(apage)
+                        if not popups: # popup content not part of the markup; render it in the browser
+                            if browser is None:
+                                browser = webdriver.Firefox(executable_path=GECKODRIVER_PATH)
+                            browser.get(BASE_URL + url)
+                            browser.set_script_timeout(POPUP_TIMEOUT * (len(apage.find_all(class_='popup--author')) + 1))
+                            popups = browser.execute_async_script(AUTHOR_POPUPS_JS, POPUP_TIMEOUT)
+                        for name, info in popups:
+                            author.append(name)
+                            info = ' '.join(line for line in (info or '').strip().split('\n') if line)
+                            author_info.append(info.replace('\xad', ''))
+                            # inferred in one batch after the crawl
+                            author_inferred_gender_wd.append(None)
+                            author_inferred_gender_ppn.append(None)
+                            author_inferred_gender_prn.append(None)
+                            # log.info(f"\t\t\tAUTHORS: {author}")
+                        if author == []:
+                            raise Exception('[[own]]')
                     except Exception as e:
-                        log.warning(f"Author(s) could not be retrieved: {e}")
-                        author = None
-                        author_info.append('')
-                        author_inferred_gender_wd.append('')
-                        author_inferred_gender_ppn.append('')
-                        author_inferred_gender_prn.append('')
-                
-            except AttributeError as e:
-                #print(e)
-                #print(title)
-                if title == 'Editorial':
-                    try:
-                        if len(atext[-1].split(' ')) < 8:
-                            author.append(atext[-1])
-                            del atext[-1]
-                        else:
-                            log.info(f"No author given for Editorial.")
-                            author = None
-                    except AttributeError as e:
-                        print(e)
-                        if len(atext[-1]['Editorial'][-1].split(' ')) < 8:
-                            author.append(atext[-1]['Editorial'][-1])
-                            del atext[-1]['Editorial'][-1]
-                        else:
-                            log.info(f"No author given for Editorial.")
+                        try:
+                            ats = apage.find('span', class_='opening-header__author').text.split('/')
+                            author.extend([n.strip() for n in ats])
+                            author_info.extend(['' for _ in ats])
+                            empty = ['' for _ in ats]
+                            author_inferred_gender_wd.extend(empty)
+                            author_inferred_gender_ppn.extend(empty)
+                            author_inferred_gender_prn.extend(empty)
+                            log.info(f"\t\t\t\tAUTHORS; no info: {author}")
+                        except Exception as e:
+                            log.warning(f"Author(s) could not be retrieved: {e}")
                             author = None
-                    author_info.append('<<EDITOR>>')
-                else:
-                    log.info(f"No author given: {e}")
-                    author_info.append('')
-                author_inferred_gender_wd.append('')
-                author_inferred_gender_ppn.append('')
-                author_inferred_gender_prn.append('')
+                            author_info.append('')
+                            author_inferred_gender_wd.append('')
+                            author_inferred_gender_ppn.append('')
+                            author_inferred_gender_prn.append('')
+                
+                except AttributeError as e:
+                    #print(e)
+                    #print(title)
+                    if title == 'Editorial':
+                        try:
+                            if len(atext[-1].split(' ')) < 8:
+                                author.append(atext[-1])
+                                del atext[-1]
+                            else:
+                                log.info(f"No author given for Editorial.")
+                                author = None
+                        except AttributeError as e:
+                            print(e)
+                            if len(atext[-1]['Editorial'][-1].split(' ')) < 8:
+                                author.append(atext[-1]['Editorial'][-1])
+                                del atext[-1]['Editorial'][-1]
+                            else:
+                                log.info(f"No author given for Editorial.")
+                                author = None
+                        author_info.append('<<EDITOR>>')
+                    else:
+                        log.info(f"No author given: {e}")
+                        author_info.append('')
+                    author_inferred_gender_wd.append('')
+                    author_inferred_gender_ppn.append('')
+                    author_inferred_gender_prn.append('')
             
-            # collect article information
-            article = {title: atext}
-            article_uuid = uuid.uuid3(uuid.NAMESPACE_URL, BASE_URL + url)
-            article_length = sum(len(par) for par in flatten_article(article)) # w/o title! w/ title: + len(title)
-
-            if author:
-                author_uuids = []
-                for a, i, g_wd, g_ppn, g_prn in zip(author, author_info, author_inferred_gender_wd, author_inferred_gender_ppn, author_inferred_gender_prn):
-                    author_uuids.append(str(uuid.uuid3(uuid.NAMESPACE_URL, BASE_URL + v.url + a.replace(' ', '_'))))
-                    authors.add((author_uuids[-1], a, i, g_wd, g_ppn, g_prn))
-                articles.append([article_uuid, title, article_length, author_uuids, v.uuid, datetime.now(timezone.utc).timestamp()])
-            else:
-                articles.append([article_uuid, title, article_length, None, v.uuid, datetime.now(timezone.utc).timestamp()])
+                # collect article information
+                article = {title: atext}
+                article_uuid = uuid.uuid3(uuid.NAMESPACE_URL, BASE_URL + url)
+                flat_article = list(flatten_article(article))
+                article_length = sum(map(len, flat_article)) # w/o title! w/ title: + len(title)
+
+                author_uuids = None
+                if author:
+                    author_uuids = []
+                    for a, i, g_wd, g_ppn, g_prn in zip(author, author_info, author_inferred_gender_wd, author_inferred_gender_ppn, author_inferred_gender_prn):
+                        author_uuids.append(str(uuid.uuid3(uuid.NAMESPACE_URL, volume_url + a.replace(' ', '_'))))
+                        authors.add((author_uuids[-1], a, i, g_wd, g_ppn, g_prn))
+                articles_writer.writerow([article_uuid, title, article_length, author_uuids, v.uuid, time.time()])
             
-            # save article
-            with open(f"{DATA_PATH_ARTICLES}{article_uuid}.json", mode='w', encoding='utf-8', newline='') as file:
-                json.dump(article, file, indent=2, ensure_ascii=False)
-                log.info(f"\t\t\tSAVE:\t{article_uuid}")
+                # save article (in the background)
+                saves.append(saver.submit(save_article, article, article_uuid))
             
-            log.debug(f"Article as JSON:\n{json.dumps(article, indent=2)}")
-            log.debug(f"Article as flattened list:\n{list(flatten_article(atext))}")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"Article as JSON:\n{json.dumps(article, indent=2)}")
+                    log.debug(f"Article as flattened list:\n{flat_article}")
 
-    browser.quit()
+    for save in saves:
+        save.result() # re-raises errors that occurred while saving
+
+    # --- author gender inference -------
+    log.info(f"INFER AUTHOR GENDERS")
+    pending = [author for author in authors if author[3] is None]
+    for author, doc in zip(pending, nlp.pipe((author[2] for author in pending), batch_size=AUTHOR_BATCH_SIZE)):
+        authors.remove(author)
+        authors.add((*author[:3], *infer_gender(doc, author[1])))
 
     # --- save lists --------------------
-    # of volumes, author, and articles
+    # of authors (complete only after the gender inference)
     with open(f"{DATA_PATH}izpb-corpus_authors.csv", mode='w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['uuid', 'author', 'info', 'inferred_gender_wd', 'inferred_gender_ppn', 'inferred_gender_prn'])
         writer.writerows(authors)
 
-    with open(f"{DATA_PATH}izpb-corpus_articles.csv", mode='w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['uuid', 'title', 'article_length', 'author_uuids', 'volume_uuid', 'retrieval_date_unix'])
-        writer.writerows(articles)
-
-    with open(f"{DATA_PATH}izpb-corpus_volumes.csv", mode='w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(corpus[0].__dict__.keys())
-        writer.writerows([elem.__dict__.values() for elem in corpus])
-
 
 if __name__ == '__main__':
     run()